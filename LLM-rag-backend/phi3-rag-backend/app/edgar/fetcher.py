@@ -1,15 +1,43 @@
 import os
+import threading
+from itertools import islice
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Optional
 
 USER_AGENT = os.getenv("EDGAR_USER_AGENT", "sec-scanner/0.1 (contact: dev@example.com)")
+# max in-flight requests to SEC hosts (fair-use limit is 10 req/s)
+SEC_CONCURRENCY = int(os.getenv("EDGAR_SEC_CONCURRENCY", "8"))
+# documents larger than this (e.g. bulk XBRL exhibits) are not downloaded
+MAX_DOC_BYTES = int(os.getenv("EDGAR_MAX_DOC_BYTES", str(100 * 1024 * 1024)))
+DOWNLOAD_CHUNK_SIZE = 65536
+
+_SEC_SLOTS = threading.BoundedSemaphore(SEC_CONCURRENCY)
+
+
+def _make_session() -> requests.Session:
+    """Build a keep-alive session so repeated SEC calls reuse TCP/TLS connections."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _make_session()
 
 
 def get_submissions_json(cik: str) -> Optional[Dict]:
     """Fetch the company submissions JSON from SEC data API for a CIK (no 'CIK' prefix)."""
     url = f"https://data.sec.gov/submissions/CIK{cik.zfill(10)}.json"
-    headers = {"User-Agent": USER_AGENT}
-    resp = requests.get(url, headers=headers, timeout=30)
+    with _SEC_SLOTS:
+        resp = _SESSION.get(url, timeout=30)
     if resp.status_code != 200:
         return None
     return resp.json()
@@ -25,19 +53,21 @@ def list_recent_filings(cik: str, form_type_filter: List[str] = None, limit: int
         return []
     filings = []
     recent = data.get("filings", {}).get("recent", {})
-    accession_list = recent.get("accessionNumber", [])
-    primary_docs = recent.get("primaryDocument", [])
-    forms = recent.get("form", [])
-    report_dates = recent.get("reportDate", [])
-    for i, acc in enumerate(accession_list[:limit]):
-        form = forms[i] if i < len(forms) else ""
+    # the submissions API returns parallel columns; zip stops at the shortest one
+    cols = zip(
+        recent.get("accessionNumber", []),
+        recent.get("primaryDocument", []),
+        recent.get("form", []),
+        recent.get("reportDate", []),
+    )
+    for acc, doc, form, report_date in islice(cols, limit):
         if form_type_filter and form not in form_type_filter:
             continue
         filings.append({
             "accessionNumber": acc,
-            "primaryDocument": primary_docs[i] if i < len(primary_docs) else None,
+            "primaryDocument": doc,
             "form": form,
-            "reportDate": report_dates[i] if i < len(report_dates) else None,
+            "reportDate": report_date,
         })
     return filings
 
@@ -55,14 +85,32 @@ def build_document_url(cik: str, accession: str, primary_doc: str) -> Optional[s
 
 
 def download_document(url: str, dest_path: str) -> bool:
-    headers = {"User-Agent": USER_AGENT}
+    """Stream a document to disk in fixed-size chunks; skip anything over MAX_DOC_BYTES.
+
+    The body is written to a temporary file next to dest_path and renamed into
+    place only once complete, so a failed or capped download never leaves a
+    truncated document behind.
+    """
+    tmp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.part"
     try:
-        r = requests.get(url, headers=headers, timeout=30)
-        if r.status_code == 200:
+        with _SEC_SLOTS, _SESSION.get(url, stream=True, timeout=30) as r:
+            if r.status_code != 200:
+                return False
+            length = r.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > MAX_DOC_BYTES:
+                return False
             os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-            with open(dest_path, "wb") as f:
-                f.write(r.content)
-            return True
+            written = 0
+            with open(tmp_path, "wb") as f:
+                for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > MAX_DOC_BYTES:
+                        return False
+                    f.write(chunk)
+        os.replace(tmp_path, dest_path)
+        return True
     except Exception:
-        pass
-    return False
+        return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
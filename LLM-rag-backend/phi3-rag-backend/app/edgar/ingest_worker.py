@@ -1,32 +1,78 @@
 import os
 import time
 import json
+import sqlite3
 import threading
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from .fetcher import list_recent_filings, build_document_url, download_document
+from .fetcher import (
+    list_recent_filings,
+    build_document_url,
+    download_document,
+    SEC_CONCURRENCY,
+)
 
 EDGAR_CIKS = os.getenv("EDGAR_CIKS", "0000320193,0000789019")
 POLL_INTERVAL = int(os.getenv("EDGAR_POLL_INTERVAL", "300"))
+PROCESSED_DB = os.getenv("EDGAR_PROCESSED_DB", "data/edgar_processed.sqlite")
+# legacy JSON list of processed accessions, imported into PROCESSED_DB once
 PROCESSED_FILE = os.getenv("EDGAR_PROCESSED_FILE", "data/edgar_processed.json")
 INGEST_ENDPOINT = os.getenv("LOCAL_INGEST_URL", "http://127.0.0.1:8000/ingest")
-USER_AGENT = os.getenv("EDGAR_USER_AGENT", "sec-scanner/0.1 (contact: dev@example.com)")
+FILING_WORKERS = int(os.getenv("EDGAR_FILING_WORKERS", "8"))
 
+def _make_ingest_session() -> requests.Session:
+    """Plain keep-alive session for the local ingest endpoint (no SEC User-Agent or rate-limit retries)."""
+    session = requests.Session()
+    # an ingest POST is not idempotent, so only failed connects are retried
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=FILING_WORKERS,
+        max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-def _load_processed():
-    if os.path.exists(PROCESSED_FILE):
-        try:
-            return set(json.load(open(PROCESSED_FILE)))
-        except Exception:
-            return set()
-    return set()
+
+# separate pool for the local ingest endpoint so it does not compete with SEC connections
+_INGEST_SESSION = _make_ingest_session()
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def _get_db():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(PROCESSED_DB) or '.', exist_ok=True)
+        conn = sqlite3.connect(PROCESSED_DB, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS seen(acc TEXT PRIMARY KEY)")
+        if os.path.exists(PROCESSED_FILE):
+            try:
+                with open(PROCESSED_FILE) as f:
+                    legacy = json.load(f)
+                conn.executemany("INSERT OR IGNORE INTO seen VALUES(?)", [(a,) for a in legacy])
+                os.remove(PROCESSED_FILE)
+            except Exception:
+                pass
+        _db = conn
+    return _db
+
+
+def _is_processed(acc: str) -> bool:
+    with _db_lock:
+        return _get_db().execute("SELECT 1 FROM seen WHERE acc=?", (acc,)).fetchone() is not None
 
 
-def _save_processed(s):
-    os.makedirs(os.path.dirname(PROCESSED_FILE) or '.', exist_ok=True)
-    with open(PROCESSED_FILE, 'w') as f:
-        json.dump(list(s), f)
+def _mark_processed(acc: str):
+    with _db_lock:
+        _get_db().execute("INSERT OR IGNORE INTO seen VALUES(?)", (acc,))
 
 
 def _post_file_to_ingest(file_path: str) -> bool:
@@ -36,8 +82,7 @@ def _post_file_to_ingest(file_path: str) -> bool:
             endpoint = os.getenv("LOCAL_INGEST_URL", INGEST_ENDPOINT)
             # send as a list to ensure multipart formfield is repeated correctly
             files = [("files", (os.path.basename(file_path), fh))]
-            headers = {"User-Agent": USER_AGENT}
-            resp = requests.post(endpoint, files=files, headers=headers, timeout=60)
+            resp = _INGEST_SESSION.post(endpoint, files=files, timeout=60)
             if resp.status_code != 200:
                 try:
                     body = resp.text
@@ -49,30 +94,58 @@ def _post_file_to_ingest(file_path: str) -> bool:
         return False
 
 
-def process_once(ciks: List[str]):
-    processed = _load_processed()
-    new_processed = False
-    for cik in ciks:
-        filings = list_recent_filings(cik, limit=10)
-        for f in filings:
-            acc = f.get('accessionNumber')
-            if not acc or acc in processed:
-                continue
-            doc = f.get('primaryDocument')
-            url = build_document_url(cik, acc, doc)
-            if not url:
-                processed.add(acc)
-                new_processed = True
-                continue
-            dest = os.path.join('data', 'edgar', cik, acc.replace('-', ''), doc)
-            ok = download_document(url, dest)
+def _ingest_file(file_path: str) -> bool:
+    """Ingest a downloaded file, in-process unless LOCAL_INGEST_URL points elsewhere."""
+    if os.getenv("LOCAL_INGEST_URL"):
+        return _post_file_to_ingest(file_path)
+    try:
+        from app.main import ingest_paths
+        ingest_paths([file_path])
+        return True
+    except Exception as e:
+        print(f"[edgar.ingest_worker] in-process ingest of {file_path} failed: {e}")
+        return False
+
+
+def _handle_one(cik: str, filing: dict):
+    """Download and ingest a single filing; return (accessionNumber, ok)."""
+    acc = filing.get('accessionNumber')
+    if not acc or _is_processed(acc):
+        return acc, False
+    doc = filing.get('primaryDocument')
+    url = build_document_url(cik, acc, doc)
+    if not url:
+        return acc, True
+    dest = os.path.join('data', 'edgar', cik, acc.replace('-', ''), doc)
+    ok = download_document(url, dest)
+    if ok and _ingest_file(dest):
+        return acc, True
+    return acc, False
+
+
+def _handle_cik(cik: str):
+    """Download and ingest unseen filings for one CIK, recording each as processed."""
+    filings = list_recent_filings(cik, limit=10)
+    if not filings:
+        return
+    # download -> ingest pipelines are independent per filing; requests
+    # releases the GIL on socket reads so threads overlap the waits
+    with ThreadPoolExecutor(max_workers=min(len(filings), FILING_WORKERS)) as ex:
+        futures = [ex.submit(_handle_one, cik, f) for f in filings]
+        for fut in as_completed(futures):
+            acc, ok = fut.result()
             if ok:
-                posted = _post_file_to_ingest(dest)
-                if posted:
-                    processed.add(acc)
-                    new_processed = True
-    if new_processed:
-        _save_processed(processed)
+                _mark_processed(acc)
+
+
+def process_once(ciks: List[str]):
+    if not ciks:
+        return
+    # CIKs are independent, so overlap their round trips; SEC calls stay
+    # bounded by the fetcher's semaphore
+    workers = min(len(ciks), SEC_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(_handle_cik, ciks))
 
 
 def run_loop():
@@ -1,7 +1,10 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.schemas import QueryRequest, QueryResponse
 from app.rag.retriever import RAGPipeline
 import os
+import threading
 from typing import Optional
 
 # optional EDGAR background ingest
@@ -12,6 +15,9 @@ except Exception:
 
 app = FastAPI(title="Phi-3 RAG Backend")
 rag = None
+# guards the vector store: ingests (HTTP endpoint and in-process EDGAR worker)
+# replace it wholesale, so searches and pipeline construction take it too
+_rag_lock = threading.Lock()
 @app.on_event("startup")
 async def startup_event():
     # Do not load RAG at startup to save memory; load lazily
@@ -23,6 +29,13 @@ async def startup_event():
         except Exception:
             pass
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # vector store writes are batched; persist whatever is still pending
+    if rag is not None:
+        with _rag_lock:
+            rag.vector_store.flush()
+
 @app.post("/ingest")
 async def ingest(files: list[UploadFile] = File(...)):
     # Clear old uploaded files
@@ -36,46 +49,75 @@ async def ingest(files: list[UploadFile] = File(...)):
         with open(path, "wb") as f:
             f.write(await file.read())
         paths.append(path)
+    # the worker thread may hold the RAG lock; wait for it off the event loop
+    await run_in_threadpool(ingest_paths, paths)
+    return {"status": "success", "ingested": len(files)}
+
+def _get_rag() -> RAGPipeline:
+    """Return the shared RAGPipeline, building it on first use; concurrent first calls build one."""
     global rag
     if rag is None:
+        with _rag_lock:
+            if rag is None:
+                rag = RAGPipeline(
+                    llm_model_path="./models-cache/qwen2.5-3b-q4k.gguf",
+                    faiss_index_path="./data/faiss_index"
+                )
+    return rag
+
+def _retrieve(question: str):
+    """Return (pipeline, prompt, context); the store is read under _rag_lock so an ingest can't swap it mid-search."""
+    pipeline = _get_rag()
+    with _rag_lock:
+        prompt, context = pipeline.build_prompt(question)
+    return pipeline, prompt, context
+
+def ingest_paths(paths: list[str]):
+    """Replace the vector store contents with the given files (shared by /ingest and the EDGAR worker)."""
+    try:
         # initialize lazily (may raise if model missing)
+        pipeline = _get_rag()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to initialize RAG: {e}")
+    with _rag_lock:
         try:
-            rag = RAGPipeline(
-                llm_model_path="./models-cache/qwen2.5-3b-q4k.gguf",
-                faiss_index_path="./data/faiss_index"
-            )
+            # Clear the vector store to use only new files
+            pipeline.vector_store.clear()
+            pipeline.ingest_documents(paths)
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to initialize RAG: {e}")
-    try:
-        # Clear the vector store to use only new files
-        rag.vector_store.clear()
-        rag.ingest_documents(paths)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to ingest documents: {e}")
-    return {"status": "success", "ingested": len(files)}
+            raise HTTPException(status_code=500, detail=f"Failed to ingest documents: {e}")
 
 @app.post("/query", response_model=QueryResponse)
 async def query(req: QueryRequest):
-    global rag
-    if rag is None:
-        rag = RAGPipeline(
-            llm_model_path="./models-cache/qwen2.5-3b-q4k.gguf",
-            faiss_index_path="./data/faiss_index"
-        )
-    ans = rag.query(req.question)
+    # retrieval and generation block; keep them off the event loop
+    pipeline, prompt, context = await run_in_threadpool(_retrieve, req.question)
+    ans = await run_in_threadpool(pipeline.answer, req.question, prompt, context)
     return QueryResponse(answer=ans)
 
 
+@app.post("/query_stream")
+async def query_stream(req: QueryRequest):
+    """Stream the answer as server-sent events while it is generated."""
+    pipeline, prompt, _ = await run_in_threadpool(_retrieve, req.question)
+
+    def _events():
+        for piece in pipeline.generate(prompt, stream=True):
+            # multi-line pieces need one data: field per line
+            yield "".join(f"data: {line}\n" for line in piece.split("\n")) + "\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(_events(), media_type="text/event-stream")
+
+
+def _search_with_scores(question: str, k: int):
+    pipeline = _get_rag()
+    with _rag_lock:
+        return pipeline.vector_store.search_with_scores(question, k=k)
+
+
 @app.post("/debug/context")
 async def debug_context(req: QueryRequest, k: Optional[int] = 3):
     """Return the top-k context documents used for a given question."""
-    global rag
-    if rag is None:
-        # try lazy init
-        rag = RAGPipeline(
-            llm_model_path="./models-cache/qwen2.5-3b-q4k.gguf",
-            faiss_index_path="./data/faiss_index"
-        )
     # use the vector store directly to get top-k context with scores
-    results = rag.vector_store.search_with_scores(req.question, k=k)
+    results = await run_in_threadpool(_search_with_scores, req.question, k)
     return {"question": req.question, "k": k, "results": results}
@@ -0,0 +1,82 @@
+import mmap
+import os
+from collections.abc import Sequence
+import numpy as np
+
+
+class DocStore(Sequence):
+    """List-like view over document texts kept in a memory-mapped sidecar.
+
+    Persisted docs live in ``<path>.docs.bin`` as concatenated UTF-8 with
+    their byte boundaries in ``<path>.offsets.npy``; ``self[i]`` decodes a
+    single slice on demand, so the corpus stays in the page cache instead of
+    Python objects. Docs added since the last ``flush`` are held in memory.
+    """
+
+    def __init__(self, path):
+        self.bin_path = f"{path}.docs.bin"
+        self.offsets_path = f"{path}.offsets.npy"
+        self._mm = None
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._pending = []
+        if os.path.exists(self.bin_path) and os.path.exists(self.offsets_path):
+            self._offsets = np.load(self.offsets_path, mmap_mode='r')
+            self._map()
+
+    def _map(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if int(self._offsets[-1]) == 0:
+            return
+        with open(self.bin_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self._offsets) - 1 + len(self._pending)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("document index out of range")
+        stored = len(self._offsets) - 1
+        if i >= stored:
+            return self._pending[i - stored]
+        return self._mm[int(self._offsets[i]):int(self._offsets[i + 1])].decode('utf-8')
+
+    def extend(self, docs):
+        self._pending.extend(docs)
+
+    def clear(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._pending = []
+        for p in (self.bin_path, self.offsets_path):
+            if os.path.exists(p):
+                os.remove(p)
+
+    def flush(self):
+        """Append pending docs to the bin file and rewrite the offsets index."""
+        if not self._pending and os.path.exists(self.offsets_path):
+            return
+        end = int(self._offsets[-1])
+        sizes = []
+        with open(self.bin_path, 'ab') as f:
+            # drop any bytes past the last recorded offset (e.g. from an interrupted flush)
+            f.truncate(end)
+            for doc in self._pending:
+                data = doc.encode('utf-8')
+                f.write(data)
+                sizes.append(len(data))
+        offsets = np.concatenate([self._offsets, end + np.cumsum(sizes, dtype=np.int64)])
+        tmp_path = f"{self.offsets_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, offsets)
+        os.replace(tmp_path, self.offsets_path)
+        self._offsets = offsets
+        self._pending = []
+        self._map()
@@ -1,13 +1,25 @@
+from concurrent.futures import ProcessPoolExecutor
 import fitz
 
+MAX_LOADER_WORKERS = 4
+
+
+def _load_one(path):
+    if path.endswith('.pdf'):
+        with fitz.open(path) as doc:
+            return "".join([page.get_text("text") for page in doc])
+    if path.endswith('.txt'):
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    return None
+
+
 def load_documents(file_paths):
-    docs = []
-    for path in file_paths:
-        if path.endswith('.pdf'):
-            doc = fitz.open(path)
-            text = "".join(page.get_text() for page in doc)
-            docs.append(text)
-        elif path.endswith('.txt'):
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                docs.append(f.read())
-    return docs
+    # a single file is cheaper to load inline than to pay for a worker process
+    if len(file_paths) <= 1:
+        texts = [_load_one(p) for p in file_paths]
+    else:
+        # separate processes avoid sharing fitz's global state across threads
+        with ProcessPoolExecutor(max_workers=min(MAX_LOADER_WORKERS, len(file_paths))) as ex:
+            texts = list(ex.map(_load_one, file_paths))
+    return [t for t in texts if t is not None]
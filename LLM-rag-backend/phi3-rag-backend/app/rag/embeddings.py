@@ -0,0 +1,77 @@
+import os
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# optional ONNX Runtime backend for the embedding model
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:
+    ort = None
+
+
+class OnnxEmbedder:
+    """Minimal SentenceTransformer-compatible `encode` over an ONNX Runtime model.
+
+    Uses CLS pooling, which is what the bge family is trained with.
+    """
+
+    def __init__(self, model, tokenizer, max_length=512):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        embeddings = None
+        for i in range(0, len(sentences), batch_size):
+            batch = self.tokenizer(
+                sentences[i:i + batch_size], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            cls = self.model(**batch).last_hidden_state[:, 0]
+            if embeddings is None:
+                # fill one preallocated output instead of concatenating per-batch arrays
+                embeddings = np.empty((len(sentences), cls.shape[1]), dtype=np.float32)
+            embeddings[i:i + len(cls)] = cls
+        if embeddings is None:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)
+        return embeddings[0] if single else embeddings
+
+
+def _load_onnx(model_name, cache_folder):
+    export_dir = os.path.join(cache_folder, "onnx", model_name.replace("/", "__"))
+    quant_dir = f"{export_dir}-int8"
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if not os.path.exists(export_dir):
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True, cache_dir=cache_folder)
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name, cache_dir=cache_folder).save_pretrained(export_dir)
+    model_dir, file_name = export_dir, "model.onnx"
+    if os.getenv("EMBEDDING_INT8", "1") == "1":
+        if not os.path.exists(quant_dir):
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            ORTQuantizer.from_pretrained(export_dir).quantize(save_dir=quant_dir, quantization_config=qconfig)
+        model_dir, file_name = quant_dir, "model_quantized.onnx"
+    model = ORTModelForFeatureExtraction.from_pretrained(
+        model_dir, file_name=file_name, provider="CPUExecutionProvider", session_options=options
+    )
+    tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    return OnnxEmbedder(model, tokenizer)
+
+
+def load_embedding_model(model_name, cache_folder="./models-cache"):
+    """Return an ONNX Runtime embedder when optimum is installed, else a SentenceTransformer."""
+    if ort is not None and os.getenv("EMBEDDING_BACKEND", "onnx") == "onnx":
+        try:
+            return _load_onnx(model_name, cache_folder)
+        except Exception as e:
+            print(f"ONNX embedding backend unavailable, using sentence-transformers: {e}")
+    return SentenceTransformer(model_name, cache_folder=cache_folder)
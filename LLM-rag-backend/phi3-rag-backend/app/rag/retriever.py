@@ -1,27 +1,62 @@
 from llama_cpp import Llama
-from sentence_transformers import SentenceTransformer
 from app.rag.vector_store import FAISSStore
 from app.rag.document_loader import load_documents
+from app.rag.embeddings import load_embedding_model
 import os
+import queue
+import re
+import threading
+
+# fallback heuristics used when the LLM returns an empty completion
+_RE_HQ_Q = re.compile(r"headquart|headquartered", re.I)
+_RE_HQ_CTX1 = re.compile(r"([A-Z][A-Za-z0-9&\.\'\- ]{1,80}) (?:'s )?headquarters is in ([A-Za-z0-9 ,]+)")
+_RE_HQ_CTX2 = re.compile(r"headquartered in ([A-Za-z0-9 ,]+)", re.I)
+_RE_RECALL_Q = re.compile(r"recall", re.I)
+_RE_RECALL_CTX = re.compile(r"^([A-Z][A-Za-z0-9&\.\'\- ]{1,80}) (?:reported|announced|issued|had) .*recall", re.I | re.M)
+
+# fixed instruction header shared by every QA prompt; its KV state is computed once
+_QA_PREFIX = """Instructions: Answer the question using ONLY the information in the context provided below. Do not use any external knowledge or make assumptions. If the context does not contain the information needed to answer the question, say "The provided context does not contain enough information to answer this question."
+
+Context:
+"""
+
+MAX_TOKENS = 512
+# end-of-stream marker on the _generate_stream queue
+_STREAM_END = object()
+# chunks retrieved per question: 6 x 400-token chunks, the QA template and
+# MAX_TOKENS fit the default 4096-token context
+QA_K = 6
+# retrieval query and chunk count used to ground "summarize" requests
+_SUMMARY_QUERY = "summary of the document"
+_SUMMARY_PREFIX = "Please summarize the following documents:\n\n"
+SUMMARY_K = 20
+# context size for summaries that do not fit the default model (loaded on demand)
+LONG_N_CTX = 16384
 
 class RAGPipeline:
     def __init__(self, llm_model_path, embedding_model_name="BAAI/bge-small-en-v1.5", faiss_index_path="./data/faiss_index"):
         print("🧠 Loading Qwen2.5-3B...")
+        self._llm_kwargs = dict(
+            model_path=llm_model_path,
+            n_threads=int(os.getenv("LLM_THREADS", 8)),
+            n_gpu_layers=int(os.getenv("GPU_LAYERS", 0)),
+            verbose=False
+        )
+        # the KV cache is sized by n_ctx, so keep the resident model small
+        self.n_ctx = int(os.getenv("LLM_N_CTX", 4096))
+        self._llm_long = None
+        # llama.cpp contexts are not thread-safe; streamed responses run off the event loop
+        self._llm_lock = threading.Lock()
         try:
-            self.llm = Llama(
-                model_path=llm_model_path,
-                n_ctx=32768,
-                n_threads=int(os.getenv("LLM_THREADS", 8)),
-                n_gpu_layers=int(os.getenv("GPU_LAYERS", 0)),
-                verbose=False
-            )
+            self.llm = Llama(n_ctx=self.n_ctx, **self._llm_kwargs)
             print("LLM loaded successfully")
         except Exception as e:
             print(f"Failed to load LLM: {e}")
             raise
+        self._prefix_state = self._eval_prefix(_QA_PREFIX)
         print("🔍 Loading embedding model...")
         try:
-            self.embedding_model = SentenceTransformer(embedding_model_name, cache_folder="./models-cache")
+            self.embedding_model = load_embedding_model(embedding_model_name, cache_folder="./models-cache")
             print("Embedding model loaded successfully")
         except Exception as e:
             print(f"Failed to load embedding model: {e}")
@@ -33,50 +68,131 @@ class RAGPipeline:
             print(f"Failed to load vector store: {e}")
             raise
 
+    def _eval_prefix(self, prefix):
+        """Evaluate a prompt prefix once and snapshot the KV cache for reuse."""
+        try:
+            self.llm.reset()
+            self.llm.eval(self.llm.tokenize(prefix.encode("utf-8"), special=True))
+            return self.llm.save_state()
+        except Exception as e:
+            print(f"Prefix cache disabled: {e}")
+            return None
+
+    def _fits(self, prompt):
+        """True if the prompt plus MAX_TOKENS of output fits the resident model's context."""
+        return len(self.llm.tokenize(prompt.encode("utf-8"), special=True)) + MAX_TOKENS <= self.n_ctx
+
+    def _llm_for(self, prompt):
+        """Return the resident model, or the long-context one for a summary that would not fit."""
+        # QA prompts are trimmed to fit in build_prompt, so they always use the
+        # resident model (and its cached instruction prefix)
+        if not prompt.startswith(_SUMMARY_PREFIX) or self._fits(prompt):
+            return self.llm
+        if self._llm_long is None:
+            print(f"🧠 Loading long-context model (n_ctx={LONG_N_CTX})...")
+            self._llm_long = Llama(n_ctx=LONG_N_CTX, **self._llm_kwargs)
+        return self._llm_long
+
     def ingest_documents(self, file_paths):
         docs = load_documents(file_paths)
         self.vector_store.add_documents(docs)
 
-    def query(self, question):
+    def build_prompt(self, question):
+        """Return (prompt, context) for a question."""
         if "summarize" in question.lower():
-            # For summarization, retrieve all documents
-            context = "\n\n".join(doc[:2000] + "..." for doc in self.docs) if self.docs else ""
+            # summarize from the most representative chunks rather than every document
+            context = self.vector_store.search(_SUMMARY_QUERY, k=SUMMARY_K)
             print(f"Debug: Summarization context length: {len(context)}")
-            prompt = f"""Please summarize the following documents:
-
-{context}
+            prompt = _SUMMARY_PREFIX + f"""{context}
 
 Summary:"""
         else:
-            context = self.vector_store.search(question, k=10)
-            prompt = f"""Instructions: Answer the question using ONLY the information in the context provided below. Do not use any external knowledge or make assumptions. If the context does not contain the information needed to answer the question, say "The provided context does not contain enough information to answer this question."
-
-Context:
-{context}
+            chunks = self.vector_store.search_chunks(question, k=QA_K)
+            while True:
+                context = "\n\n".join(chunks)
+                prompt = _QA_PREFIX + f"""{context}
 
 Question: {question}
 
 Answer:"""
+                # dense (e.g. tabular) chunks can tokenize long; drop the
+                # lowest-ranked ones until the prompt fits
+                if len(chunks) <= 1 or self._fits(prompt):
+                    break
+                chunks = chunks[:-1]
+        return prompt, context
+
+    def generate(self, prompt, stream=False):
+        """Run the LLM on a prompt; with stream=True, return an iterator of text pieces."""
+        if stream:
+            return self._generate_stream(prompt)
+        with self._llm_lock:
+            output = self._complete(prompt, stream=False)
+            return output["choices"][0]["text"]
+
+    def _generate_stream(self, prompt):
+        # generation runs on its own thread and hands pieces over a queue, so the
+        # LLM lock is never held across a yield (i.e. while a slow client reads)
+        pieces = queue.Queue()
+        cancelled = threading.Event()
+
+        def _produce():
+            try:
+                with self._llm_lock:
+                    for chunk in self._complete(prompt, stream=True):
+                        if cancelled.is_set():
+                            break
+                        pieces.put(chunk["choices"][0]["text"])
+            except Exception as e:
+                pieces.put(e)
+            finally:
+                pieces.put(_STREAM_END)
+
+        threading.Thread(target=_produce, daemon=True).start()
+        try:
+            while True:
+                piece = pieces.get()
+                if piece is _STREAM_END:
+                    return
+                if isinstance(piece, Exception):
+                    raise piece
+                yield piece
+        finally:
+            # client went away: stop generating at the next token
+            cancelled.set()
+
+    def _complete(self, prompt, stream):
+        llm = self._llm_for(prompt)
+        if llm is self.llm and self._prefix_state is not None and prompt.startswith(_QA_PREFIX):
+            # completion prefix-matches against the restored tokens, so only
+            # the context and question are evaluated
+            self.llm.load_state(self._prefix_state)
         # Avoid stopping on a single newline which can produce empty completions
-        output = self.llm(prompt, max_tokens=512, stop=["Question:"], echo=False)
-        text = output["choices"][0]["text"].strip()
+        return llm(prompt, max_tokens=MAX_TOKENS, stop=["Question:"], echo=False, stream=stream)
+
+    def query(self, question):
+        prompt, context = self.build_prompt(question)
+        return self.answer(question, prompt, context)
+
+    def answer(self, question, prompt, context):
+        """Generate the answer for a prompt from build_prompt, falling back to context heuristics."""
+        text = self.generate(prompt).strip()
         if text:
             return text
 
         # Fallback heuristics if the LLM returned an empty completion
-        import re
         # Headquarter pattern
-        if re.search(r"headquart|headquartered", question, re.I):
-            m = re.search(r"([A-Z][A-Za-z0-9&\.\'\- ]{1,80}) (?:'s )?headquarters is in ([A-Za-z0-9 ,]+)", context)
+        if _RE_HQ_Q.search(question):
+            m = _RE_HQ_CTX1.search(context)
             if m:
                 return m.group(2).strip()
-            m2 = re.search(r"headquartered in ([A-Za-z0-9 ,]+)", context, re.I)
+            m2 = _RE_HQ_CTX2.search(context)
             if m2:
                 return m2.group(1).strip()
 
         # Product recall pattern
-        if re.search(r"recall", question, re.I):
-            m = re.search(r"^([A-Z][A-Za-z0-9&\.\'\- ]{1,80}) (?:reported|announced|issued|had) .*recall", context, re.I | re.M)
+        if _RE_RECALL_Q.search(question):
+            m = _RE_RECALL_CTX.search(context)
             if m:
                 return m.group(1).strip()
 
@@ -1,57 +1,169 @@
 import os
+from collections import OrderedDict
 import faiss
 import numpy as np
+from app.rag.doc_store import DocStore
+
+EMBEDDING_DIM = 384  # bge-small-en-v1.5 dimension
+# above this many vectors a flat scan costs more than IVF-PQ's coarse search
+IVF_THRESHOLD = 10000
+IVF_PQ_M = 48  # subquantizers; 384 / 48 = 8 dims each
+IVF_PQ_NBITS = 8
+IVF_NPROBE = 8
+QUERY_CACHE_SIZE = 512
+# bge-small truncates at 512 tokens, so documents are embedded as overlapping windows
+CHUNK_TOKENS = 400
+CHUNK_OVERLAP = 50
+ENCODE_BATCH_SIZE = 64
+# unsaved chunks tolerated before the index and doc sidecar are written to disk
+DIRTY_THRESHOLD = 64
+
+
+def _new_index(dim=EMBEDDING_DIM):
+    # embeddings are L2-normalized, so inner product ranks like L2 distance;
+    # fp16 storage halves memory and per-query bandwidth
+    return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+
 
 class FAISSStore:
     def __init__(self, embedding_model, index_path):
         self.embedding_model = embedding_model
         self.index_path = index_path
         self.index = None
-        self.docs = []
+        self.docs = DocStore(index_path)
+        # query embeddings depend only on the text, not the corpus, so they
+        # stay valid across ingests
+        self._query_cache = OrderedDict()
+        self._dirty_count = 0
         self._load_or_create_index()
 
     def _load_or_create_index(self):
-        dim = 384
         if os.path.exists(f"{self.index_path}.faiss"):
             self.index = faiss.read_index(f"{self.index_path}.faiss")
-            with open(f"{self.index_path}.docs", "r") as f:
-                self.docs = f.read().split("\n--DOC--\n")[:-1]
+            if isinstance(self.index, faiss.IndexIVF):
+                self.index.nprobe = IVF_NPROBE
+            legacy_docs = f"{self.index_path}.docs"
+            if not len(self.docs) and os.path.exists(legacy_docs):
+                # migrate the old separator-joined text file to the binary sidecar
+                with open(legacy_docs, "r") as f:
+                    text = f.read()
+                self.docs.extend(text.split("\n--DOC--\n") if text else [])
+                self.docs.flush()
+                os.remove(legacy_docs)
+            if self.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+                self._rebuild_as_inner_product()
         else:
-            self.index = faiss.IndexFlatL2(dim)
+            self.index = _new_index()
+            # sidecar without an index cannot be trusted to line up with new ids
+            self.docs.clear()
+
+    def _rebuild_as_inner_product(self):
+        """Convert an index saved with an L2 metric (e.g. the old IndexFlatL2) to the fp16 IP index.
+
+        The stored vectors are L2-normalized, so they are reused as-is; only the
+        metric changes, making scores cosine similarities (higher is better).
+        """
+        vecs = self.index.reconstruct_n(0, self.index.ntotal)
+        index = _new_index(self.index.d)
+        if len(vecs):
+            index.add(np.ascontiguousarray(vecs, dtype=np.float32))
+        self.index = index
+        self._maybe_reindex()
+        self._save_index()
+
+    def _chunk(self, text, size=CHUNK_TOKENS, overlap=CHUNK_OVERLAP):
+        """Split text into windows of `size` tokens overlapping by `overlap` tokens."""
+        enc = self.embedding_model.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+        )
+        offsets = enc["offset_mapping"]
+        if not offsets:
+            return [text] if text.strip() else []
+        chunks = []
+        step = size - overlap
+        for start in range(0, len(offsets), step):
+            window = offsets[start:start + size]
+            # slice the original text so chunks keep their exact spelling/spacing
+            chunks.append(text[window[0][0]:window[-1][1]])
+            if start + size >= len(offsets):
+                break
+        return chunks
 
     def add_documents(self, docs):
-        embeddings = self.embedding_model.encode(docs, normalize_embeddings=True)
+        chunks = [c for d in docs for c in self._chunk(d)]
+        if not chunks:
+            return
+        embeddings = self.embedding_model.encode(
+            chunks, batch_size=ENCODE_BATCH_SIZE, normalize_embeddings=True, convert_to_numpy=True
+        )
+        # encode() already returns C-contiguous float32; this only copies if it did not
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         if self.index is None:
-            dim = embeddings.shape[1]
-            self.index = faiss.IndexFlatL2(dim)
-        self.index.add(np.array(embeddings).astype('float32'))
-        self.docs.extend(docs)
-        self._save_index()
+            self.index = _new_index(embeddings.shape[1])
+        self.index.add(embeddings)
+        self.docs.extend(chunks)
+        self._maybe_reindex()
+        self._dirty_count += len(chunks)
+        if self._dirty_count >= DIRTY_THRESHOLD:
+            self._save_index()
 
-    def search(self, query, k=3):
-        # If no documents have been ingested yet, return empty context
+    def _maybe_reindex(self):
+        """Rebuild a flat index as IVF-PQ once the corpus is large enough to benefit."""
+        if isinstance(self.index, faiss.IndexIVF) or self.index.ntotal <= IVF_THRESHOLD:
+            return
+        n = self.index.ntotal
+        dim = self.index.d
+        vecs = self.index.reconstruct_n(0, n)
+        nlist = int(4 * np.sqrt(n))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, IVF_PQ_M, IVF_PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+        index.train(vecs)
+        index.add(vecs)
+        index.nprobe = IVF_NPROBE
+        # keep the quantizer alive alongside the index
+        self._quantizer = quantizer
+        self.index = index
+
+    def _embed_query(self, query):
+        """Encode a query, reusing the embedding for recently seen query strings."""
+        vec = self._query_cache.get(query)
+        if vec is not None:
+            self._query_cache.move_to_end(query)
+            return vec
+        vec = self.embedding_model.encode([query], normalize_embeddings=True, convert_to_numpy=True)
+        vec = np.ascontiguousarray(vec, dtype=np.float32)
+        self._query_cache[query] = vec
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return vec
+
+    def search_chunks(self, query, k=3):
+        """Return the top-k chunk texts for a query, best first."""
+        # If no documents have been ingested yet, return no context
         if not self.docs or self.index is None or getattr(self.index, 'ntotal', 0) == 0:
-            return ""
-        query_vec = self.embedding_model.encode([query], normalize_embeddings=True)
+            return []
+        query_vec = self._embed_query(query)
         k_search = min(k, len(self.docs))
-        D, I = self.index.search(np.array(query_vec).astype('float32'), k_search)
-        results = [self.docs[i] for i in I[0] if i < len(self.docs)]
-        return "\n\n".join(results)
+        D, I = self.index.search(query_vec, k_search)
+        return [self.docs[i] for i in I[0] if 0 <= i < len(self.docs)]
+
+    def search(self, query, k=3):
+        return "\n\n".join(self.search_chunks(query, k=k))
 
     def search_with_scores(self, query, k=3):
-        """Return list of top-k results with indices and distances/scores.
+        """Return list of top-k results with indices and cosine similarity scores (higher is better).
 
         Returns: [ {"id": int, "score": float, "text": str}, ... ]
         """
         if not self.docs or self.index is None or getattr(self.index, 'ntotal', 0) == 0:
             return []
-        query_vec = self.embedding_model.encode([query], normalize_embeddings=True)
+        query_vec = self._embed_query(query)
         k_search = min(k, len(self.docs))
-        D, I = self.index.search(np.array(query_vec).astype('float32'), k_search)
+        D, I = self.index.search(query_vec, k_search)
         out = []
         for j in range(k_search):
             idx = int(I[0][j])
-            if idx < len(self.docs):
+            if 0 <= idx < len(self.docs):
                 out.append({
                     "id": idx,
                     "score": float(D[0][j]),
@@ -60,13 +172,17 @@ class FAISSStore:
         return out
 
     def clear(self):
-        dim = 384  # bge-small-en-v1.5 dimension
-        self.index = faiss.IndexFlatL2(dim)
-        self.docs = []
+        self.index = _new_index()
+        self.docs.clear()
         self._save_index()
 
+    def flush(self):
+        """Persist any chunks added since the last save."""
+        if self._dirty_count:
+            self._save_index()
+
     def _save_index(self):
         os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
         faiss.write_index(self.index, f"{self.index_path}.faiss")
-        with open(f"{self.index_path}.docs", "w") as f:
-            f.write("\n--DOC--\n".join(self.docs))
+        self.docs.flush()
+        self._dirty_count = 0
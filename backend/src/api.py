@@ -1,16 +1,30 @@
 from fastapi import FastAPI, HTTPException, Query, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import os
 import shutil
 import tempfile
+import threading
 from pathlib import Path
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
 import traceback
-import requests
+import httpx
+import json
 import re
 
+# optional C JSON codec for metadata reads and the /analyze response
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Local modules (assumed to exist)
 from .stock_info import get_symbols_from_csv, fetch_yfinance_data
 from .event_detector import EventDetector
@@ -34,28 +48,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def _json_response(content) -> Response:
+    """Serialize content directly, skipping FastAPI's jsonable_encoder walk."""
+    if orjson is None:
+        return JSONResponse(content)
+    return Response(orjson.dumps(content), media_type="application/json")
+
+@lru_cache(maxsize=1)
+def _get_detector() -> EventDetector:
+    """Build the EventDetector (config load + regex compilation) once per process."""
+    return EventDetector()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Lazily start the worker processes used for per-filing analysis."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # each worker builds its EventDetector once, up front
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_get_detector)
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next _get_pool() starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _map_in_pool(fn, jobs):
+    """Run fn over jobs in the worker pool, retrying once on a fresh pool if a worker died."""
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            return list(pool.map(fn, *zip(*jobs)))
+        except BrokenProcessPool:
+            # a worker was killed (OOM, native crash); the pool is unusable from now on
+            _discard_pool(pool)
+            if attempt:
+                raise
+
+@app.on_event("shutdown")
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
 # --- Endpoints ---
 
 @app.post("/stock-info")
 async def stock_info(csv_file: UploadFile = File(...)):
     """Upload a CSV file, extract stock symbols, fetch yfinance info, and return as JSON."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp:
-        contents = await csv_file.read()
-        tmp.write(contents)
-        tmp_path = tmp.name
-
-    try:
-        symbols = get_symbols_from_csv(tmp_path)
-        if not symbols:
-            raise HTTPException(status_code=400, detail="No stock symbols found in CSV.")
-        data = fetch_yfinance_data(symbols)
-        return {"symbols": symbols, "data": data}
-    finally:
-        os.unlink(tmp_path)  # safer than os.remove in some edge cases
+    # parse straight from the upload's spooled file; no copy to a second tempfile
+    symbols = get_symbols_from_csv(csv_file.file)
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No stock symbols found in CSV.")
+    data = fetch_yfinance_data(symbols)
+    return {"symbols": symbols, "data": data}
 
 
 @app.get("/analyze")
-def analyze_ticker(
+async def analyze_ticker(
     ticker: str = Query(..., min_length=1, max_length=10),
     limit: int = Query(1, ge=1, le=50),
     window_days: int = Query(365, ge=1, le=3650),
@@ -68,227 +125,276 @@ def analyze_ticker(
     limit = min(limit, 50)
 
     with tempfile.TemporaryDirectory() as temp_dir:
-        original_cwd = os.getcwd()
         try:
-            os.chdir(temp_dir)
-            folder = download_sec_filings(ticker, num_filings=limit)
-            if not folder:
-                raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found.")
+            # download and analysis block on I/O and CPU; keep them off the event loop
+            result, payloads = await asyncio.to_thread(
+                _do_analyze, ticker, limit, window_days, include_raw, temp_dir
+            )
 
-            try:
-                detector = EventDetector()
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Event detector init error: {e}")
+            # Upload the downloaded filings to the Phi-3 RAG backend
+            if payloads:
+                await _upload_to_phi3(payloads)
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+
+    return _json_response(result)
+
+
+def _do_analyze(ticker: str, limit: int, window_days: int, include_raw: bool, temp_dir: str):
+    """Download and analyze filings under temp_dir; return the response body and processed texts to upload."""
+    folder = download_sec_filings(ticker, num_filings=limit, dest_dir=temp_dir)
+    if not folder:
+        raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found.")
+
+    try:
+        _get_detector()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Event detector init error: {e}")
+
+    filings = _index_filings(folder)
+    # one "today" for every date comparison in this request
+    today = datetime.now().date()
+    jobs = []
+    for i in range(1, limit + 1):
+        if i not in filings:
+            break
+
+        txt_path, metadata_path = filings[i]
+        if txt_path is None:
+            continue
+        jobs.append((i, txt_path, metadata_path, window_days, include_raw, today))
+
+    # a single filing is cheaper to analyze inline than to hand to a worker process
+    if len(jobs) <= 1:
+        outcomes = [_analyze_one_filing(*job) for job in jobs]
+    else:
+        # filings are independent and CPU-bound, so spread them over processes
+        outcomes = _map_in_pool(_analyze_one_filing, jobs)
+
+    all_dangerous = [entry for entry, _ in outcomes if entry is not None]
+    payloads = [payload for _, payload in outcomes if payload is not None]
+    filings_analyzed = len(jobs)
 
-            all_dangerous = []
-            filings_analyzed = 0
-            all_txt_paths = []
+    result = {
+        "ticker": ticker,
+        "filings_analyzed": filings_analyzed,
+        "results": all_dangerous
+    }
 
-            for i in range(1, limit + 1):
-                filing_dir = Path(folder) / str(i)
-                if not filing_dir.exists():
-                    break
+    return result, payloads
 
-                txt_files = list(filing_dir.glob("*.txt"))
-                if not txt_files:
-                    continue
 
+def _index_filings(folder: str):
+    """Map each numbered filing dir under folder to its (.txt path, metadata.json path or None)."""
+    filings = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not entry.name.isdecimal():
+                continue
+            txt_path = metadata_path = None
+            if entry.is_dir():
+                with os.scandir(entry.path) as files:
+                    for f in files:
+                        if f.name == "metadata.json":
+                            metadata_path = f.path
+                        elif txt_path is None and f.name.endswith(".txt"):
+                            txt_path = f.path
+            filings[int(entry.name)] = (txt_path, metadata_path)
+    return filings
+
+
+def _analyze_one_filing(i: int, filing_path: str, metadata_path: Optional[str],
+                        window_days: int, include_raw: bool, today: date):
+    """Analyze filing number i; return its result entry (or None) and its (filename, processed text) upload."""
+    payload = None
+    try:
+        full_text = process_filing_file(filing_path)
+        bounds = _sentence_bounds(full_text)
+        # processed text goes to phi3 straight from memory
+        payload = (f"processed_{i}.txt", full_text.encode('utf-8'))
+        dangerous = find_dangerous_sentences(full_text)
+        detected_events = _get_detector().detect_events(full_text)
+    except Exception as e:
+        print(f"Error processing filing {i}: {e}")
+        print(traceback.format_exc())
+        return {"filing_number": i, "error": str(e)}, payload
+
+    # Load metadata
+    filing_date = "N/A"
+    form_type = "N/A"
+    filing_dt = None
+    days_ago = None
+    if metadata_path is not None:
+        with open(metadata_path, "rb") as mf:
+            metadata = _json_loads(mf.read())
+            filing_date = metadata.get("filing_date", "N/A")
+            form_type = metadata.get("form_type", "N/A")
+            if filing_date != "N/A":
                 try:
-                    filings_analyzed += 1
-                    filing_path = txt_files[0]
-                    full_text = process_filing_file(str(filing_path))
-                    # Create a processed text file
-                    processed_path = os.path.join(temp_dir, f"processed_{i}.txt")
-                    with open(processed_path, 'w', encoding='utf-8') as pf:
-                        pf.write(full_text)
-                    all_txt_paths.append(processed_path)
-                    dangerous = find_dangerous_sentences(full_text)
-                    detected_events = detector.detect_events(full_text)
-                except Exception as e:
-                    print(f"Error processing filing {i}: {e}")
-                    print(traceback.format_exc())
-                    all_dangerous.append({"filing_number": i, "error": str(e)})
-                    continue
-
-                # Load metadata
-                metadata_path = filing_dir / "metadata.json"
-                filing_date = "N/A"
-                form_type = "N/A"
-                days_ago = None
-                if metadata_path.exists():
-                    import json
-                    with open(metadata_path, "r") as mf:
-                        metadata = json.load(mf)
-                        filing_date = metadata.get("filing_date", "N/A")
-                        form_type = metadata.get("form_type", "N/A")
-                        if filing_date != "N/A":
-                            try:
-                                filing_dt = datetime.strptime(filing_date, "%Y-%m-%d").date()
-                                today = datetime.now().date()
-                                days_ago = (today - filing_dt).days
-                            except ValueError:
-                                days_ago = None
-
-                # Enrich events
-                enriched_events = []
-                if detected_events:
-                    for ev in detected_events:
-                        ev_copy = ev.copy()
-                        match_span = ev_copy.get('match_span')
-                        event_start = None
-
-                        if match_span and isinstance(match_span, (list, tuple)):
-                            try:
-                                parsed = _parse_date_nearest_to_span(full_text, match_span, filing_date, window_days)
-                                if parsed:
-                                    event_start = parsed
-                            except Exception:
-                                pass
-
-                        if not event_start and filing_date != "N/A":
-                            try:
-                                event_start = datetime.strptime(filing_date, "%Y-%m-%d").date()
-                            except Exception:
-                                pass
-
-                        ev_copy['event_started_on'] = None
-                        ev_copy['event_ends_on'] = None
-                        ev_copy['days_remaining'] = None
-                        ev_copy['time_relation'] = 'unknown'
-
-                        if event_start is not None:
-                            try:
-                                T_star = int(ev_copy.get('T_star_days', 0))
-                                end_dt = event_start + timedelta(days=T_star)
-                                ev_copy['event_started_on'] = event_start.isoformat()
-                                ev_copy['event_ends_on'] = end_dt.isoformat()
-                                ev_copy['days_remaining'] = (end_dt - datetime.now().date()).days
-
-                                today = datetime.now().date()
-                                if end_dt < today:
-                                    ev_copy['time_relation'] = 'past'
-                                elif event_start > today:
-                                    ev_copy['time_relation'] = 'future'
-                                else:
-                                    ev_copy['time_relation'] = 'ongoing'
-                            except Exception:
-                                pass
-
-                        try:
-                            ev_copy['trigger_sentence'] = _get_sentence_for_span(full_text, match_span)
-                        except Exception:
-                            ev_copy['trigger_sentence'] = None
-
-                        enriched_events.append(ev_copy)
-
-                # Group events by type
-                grouped = {}
-                for ev in enriched_events:
-                    et = ev.get('event_type')
-                    if not et:
-                        continue
-                    if et not in grouped:
-                        grouped[et] = {
-                            'event_type': et,
-                            'event_nature': ev.get('event_nature'),
-                            'likely_triggers': list(dict.fromkeys(ev.get('likely_triggers') or [])),
-                            'description': ev.get('description'),
-                            'confidence_interval': ev.get('confidence_interval'),
-                            'count': 0,
-                            'subevents': []
-                        }
-                    g = grouped[et]
-                    span = tuple(ev.get('match_span') or [])
-                    existing_spans = {tuple(s.get('match_span') or []) for s in g['subevents']}
-                    if span in existing_spans:
-                        continue
-                    g['subevents'].append(ev)
-                    g['count'] += 1
-                    for lt in ev.get('likely_triggers') or []:
-                        if lt not in g['likely_triggers']:
-                            g['likely_triggers'].append(lt)
-
-                grouped_list = []
-                for et, g in grouped.items():
-                    if not g['subevents']:
-                        continue
-                    subs = g['subevents']
-                    subs_sorted = sorted(
-                        subs,
-                        key=lambda s: (0 if s.get('pattern_source') == 'regex' else 1, -len(s.get('match_text') or ''))
-                    )
-                    rep = subs_sorted[0]
-                    g['representative_match'] = rep.get('match_text')
-                    g['T_star_days'] = rep.get('T_star_days')
-
-                    starts = [s.get('event_started_on') for s in subs if s.get('event_started_on')]
-                    ends = [s.get('event_ends_on') for s in subs if s.get('event_ends_on')]
-
-                    try:
-                        start_dates = [datetime.fromisoformat(x).date() for x in starts]
-                        end_dates = [datetime.fromisoformat(x).date() for x in ends]
-                        g['event_started_on'] = min(start_dates).isoformat() if start_dates else None
-                        g['event_ends_on'] = max(end_dates).isoformat() if end_dates else None
-                        if g['event_ends_on']:
-                            g['days_remaining'] = (
-                                datetime.fromisoformat(g['event_ends_on']).date() - datetime.now().date()
-                            ).days
-
-                        relations = [s.get('time_relation') for s in subs if s.get('time_relation')]
-                        if any(r == 'future' for r in relations):
-                            g['time_relation'] = 'future'
-                        elif any(r == 'ongoing' for r in relations):
-                            g['time_relation'] = 'ongoing'
-                        elif relations and all(r == 'past' for r in relations):
-                            g['time_relation'] = 'past'
-                        else:
-                            g['time_relation'] = 'unknown'
-                    except Exception:
-                        g['event_started_on'] = None
-                        g['event_ends_on'] = None
-                        g['days_remaining'] = None
-                        g['time_relation'] = 'unknown'
-
-                    grouped_list.append(g)
-
-                if dangerous or grouped_list:
-                    result_entry = {
-                        "filing_number": i,
-                        "filing_date": filing_date,
-                        "form_type": form_type,
-                        "sentences": dangerous,
-                        "detected_event_categories": grouped_list,
-                    }
-                    if days_ago is not None:
-                        result_entry["days_ago"] = days_ago
-                    if include_raw:
-                        result_entry["detected_events"] = enriched_events
-                    all_dangerous.append(result_entry)
-
-            result = {
-                "ticker": ticker,
-                "filings_analyzed": filings_analyzed,
-                "results": all_dangerous
-            }
+                    filing_dt = datetime.strptime(filing_date, "%Y-%m-%d").date()
+                    days_ago = (today - filing_dt).days
+                except ValueError:
+                    filing_dt = None
+                    days_ago = None
+
+    # Enrich events
+    enriched_events = []
+    if detected_events:
+        # scan the filing for dates once and window them around the filing date
+        date_candidates = _find_dates_in_text(full_text)
+        if filing_dt is not None:
+            min_dt = filing_dt - timedelta(days=window_days)
+            max_dt = filing_dt + timedelta(days=window_days)
+            date_candidates = [c for c in date_candidates if min_dt <= c[0] <= max_dt]
 
-            # Upload the downloaded filings to the Phi-3 RAG backend
-            if all_txt_paths:
+        for ev in detected_events:
+            ev_copy = ev.copy()
+            match_span = ev_copy.get('match_span')
+            event_start = None
+
+            if match_span and isinstance(match_span, (list, tuple)):
                 try:
-                    files = [("files", open(path, "rb")) for path in all_txt_paths]
-                    resp = requests.post("http://127.0.0.1:8010/ingest", files=files, timeout=30)
-                    for _, f in files:
-                        f.close()
-                    if resp.status_code != 200:
-                        print(f"Failed to upload to phi3: {resp.status_code} {resp.text}")
-                except Exception as e:
-                    print(f"Error uploading to phi3: {e}")
+                    parsed = _parse_date_nearest_to_span(date_candidates, match_span)
+                    if parsed:
+                        event_start = parsed
+                except Exception:
+                    pass
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
-        finally:
-            os.chdir(original_cwd)
+            if not event_start:
+                event_start = filing_dt
+
+            ev_copy['event_started_on'] = None
+            ev_copy['event_ends_on'] = None
+            ev_copy['days_remaining'] = None
+            ev_copy['time_relation'] = 'unknown'
 
-    return result
+            if event_start is not None:
+                try:
+                    T_star = int(ev_copy.get('T_star_days', 0))
+                    end_dt = event_start + timedelta(days=T_star)
+                    ev_copy['event_started_on'] = event_start.isoformat()
+                    ev_copy['event_ends_on'] = end_dt.isoformat()
+                    ev_copy['days_remaining'] = (end_dt - today).days
+
+                    if end_dt < today:
+                        ev_copy['time_relation'] = 'past'
+                    elif event_start > today:
+                        ev_copy['time_relation'] = 'future'
+                    else:
+                        ev_copy['time_relation'] = 'ongoing'
+                except Exception:
+                    pass
+
+            try:
+                ev_copy['trigger_sentence'] = _get_sentence_for_span(full_text, match_span, bounds=bounds)
+            except Exception:
+                ev_copy['trigger_sentence'] = None
+
+            enriched_events.append(ev_copy)
+
+    # Group events by type
+    grouped = {}
+    # per-type membership sets, so dedup is not a rescan of the group so far
+    seen_spans = {}
+    seen_triggers = {}
+    for ev in enriched_events:
+        et = ev.get('event_type')
+        if not et:
+            continue
+        if et not in grouped:
+            grouped[et] = {
+                'event_type': et,
+                'event_nature': ev.get('event_nature'),
+                'likely_triggers': list(dict.fromkeys(ev.get('likely_triggers') or [])),
+                'description': ev.get('description'),
+                'confidence_interval': ev.get('confidence_interval'),
+                'count': 0,
+                'subevents': []
+            }
+            seen_spans[et] = set()
+            seen_triggers[et] = set(grouped[et]['likely_triggers'])
+        g = grouped[et]
+        span = tuple(ev.get('match_span') or [])
+        if span in seen_spans[et]:
+            continue
+        seen_spans[et].add(span)
+        g['subevents'].append(ev)
+        g['count'] += 1
+        triggers = seen_triggers[et]
+        for lt in ev.get('likely_triggers') or []:
+            if lt not in triggers:
+                triggers.add(lt)
+                g['likely_triggers'].append(lt)
+
+    grouped_list = []
+    for et, g in grouped.items():
+        if not g['subevents']:
+            continue
+        subs = g['subevents']
+        subs_sorted = sorted(
+            subs,
+            key=lambda s: (0 if s.get('pattern_source') == 'regex' else 1, -len(s.get('match_text') or ''))
+        )
+        rep = subs_sorted[0]
+        g['representative_match'] = rep.get('match_text')
+        g['T_star_days'] = rep.get('T_star_days')
+
+        starts = [s.get('event_started_on') for s in subs if s.get('event_started_on')]
+        ends = [s.get('event_ends_on') for s in subs if s.get('event_ends_on')]
+
+        try:
+            start_dates = [datetime.fromisoformat(x).date() for x in starts]
+            end_dates = [datetime.fromisoformat(x).date() for x in ends]
+            g['event_started_on'] = min(start_dates).isoformat() if start_dates else None
+            g['event_ends_on'] = max(end_dates).isoformat() if end_dates else None
+            if g['event_ends_on']:
+                g['days_remaining'] = (
+                    datetime.fromisoformat(g['event_ends_on']).date() - today
+                ).days
+
+            relations = [s.get('time_relation') for s in subs if s.get('time_relation')]
+            if any(r == 'future' for r in relations):
+                g['time_relation'] = 'future'
+            elif any(r == 'ongoing' for r in relations):
+                g['time_relation'] = 'ongoing'
+            elif relations and all(r == 'past' for r in relations):
+                g['time_relation'] = 'past'
+            else:
+                g['time_relation'] = 'unknown'
+        except Exception:
+            g['event_started_on'] = None
+            g['event_ends_on'] = None
+            g['days_remaining'] = None
+            g['time_relation'] = 'unknown'
+
+        grouped_list.append(g)
+
+    if dangerous or grouped_list:
+        result_entry = {
+            "filing_number": i,
+            "filing_date": filing_date,
+            "form_type": form_type,
+            "sentences": dangerous,
+            "detected_event_categories": grouped_list,
+        }
+        if days_ago is not None:
+            result_entry["days_ago"] = days_ago
+        if include_raw:
+            result_entry["detected_events"] = enriched_events
+        return result_entry, payload
+    return None, payload
+
+
+async def _upload_to_phi3(payloads):
+    try:
+        files = [("files", (name, data, "text/plain")) for name, data in payloads]
+        async with httpx.AsyncClient(timeout=30) as client:
+            resp = await client.post("http://127.0.0.1:8010/ingest", files=files)
+        if resp.status_code != 200:
+            print(f"Failed to upload to phi3: {resp.status_code} {resp.text}")
+    except Exception as e:
+        print(f"Error uploading to phi3: {e}")
 
 
 # --- Helper Functions (moved below for clarity) ---
@@ -324,66 +430,55 @@ def _parse_date_from_text(text: str):
     return None
 
 
+# one scan per format, as overlapping formats must not hide each other: a
+# date-shaped match that fails to parse (e.g. "loss 5, 2023" as a month name)
+# must not consume a valid date it overlaps ("2023-01-05")
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_US_DATE_RE = re.compile(r"\d{1,2}/\d{1,2}/\d{2,4}")
+_NAME_DATE_RE = re.compile(r"[A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4}")
+_US_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y")
+_NAME_DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y")
+
+
+def _strptime_first(s: str, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
 def _find_dates_in_text(text: str):
     if not text:
         return []
+    # results keep the ISO, mm/dd/yyyy, month-name grouping since that order
+    # breaks ties in _parse_date_nearest_to_span
     dates = []
-    # ISO
-    for m in re.finditer(r"(\d{4}-\d{2}-\d{2})", text):
+    for m in _ISO_DATE_RE.finditer(text):
+        s = m.group()
         try:
-            d = datetime.strptime(m.group(1), "%Y-%m-%d").date()
-            dates.append((d, m.start(1), m.end(1)))
+            d = date(int(s[:4]), int(s[5:7]), int(s[8:10]))
         except ValueError:
             continue
-    # mm/dd/yyyy
-    for m in re.finditer(r"(\d{1,2}/\d{1,2}/\d{2,4})", text):
-        s = m.group(1)
-        for fmt in ("%m/%d/%Y", "%m/%d/%y"):
-            try:
-                d = datetime.strptime(s, fmt).date()
-                dates.append((d, m.start(1), m.end(1)))
-                break
-            except ValueError:
-                continue
-    # Month name
-    for m in re.finditer(r"([A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4})", text):
-        s = m.group(1)
-        for fmt in ("%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y"):
-            try:
-                d = datetime.strptime(s, fmt).date()
-                dates.append((d, m.start(1), m.end(1)))
-                break
-            except ValueError:
-                continue
+        dates.append((d, m.start(), m.end()))
+    for regex, formats in ((_US_DATE_RE, _US_DATE_FORMATS), (_NAME_DATE_RE, _NAME_DATE_FORMATS)):
+        for m in regex.finditer(text):
+            d = _strptime_first(m.group(), formats)
+            if d is not None:
+                dates.append((d, m.start(), m.end()))
     return dates
 
 
-def _parse_date_nearest_to_span(text: str, match_span, filing_date=None, window_days: int = 365):
-    if not text or not match_span:
+def _parse_date_nearest_to_span(candidates, match_span):
+    """Return the date among (date, start, end) candidates positioned closest to match_span."""
+    if not candidates or not match_span:
         return None
     try:
         s_span, e_span = int(match_span[0]), int(match_span[1])
     except (ValueError, TypeError):
         return None
 
-    candidates = _find_dates_in_text(text)
-    if not candidates:
-        return None
-
-    if filing_date:
-        try:
-            if isinstance(filing_date, str):
-                filing_dt = datetime.strptime(filing_date, "%Y-%m-%d").date()
-            else:
-                filing_dt = filing_date
-            min_dt = filing_dt - timedelta(days=window_days)
-            max_dt = filing_dt + timedelta(days=window_days)
-            candidates = [(d, ds, de) for (d, ds, de) in candidates if min_dt <= d <= max_dt]
-            if not candidates:
-                return None
-        except ValueError:
-            pass
-
     center = (s_span + e_span) / 2
     best, best_dist = None, None
     for d, ds, de in candidates:
@@ -394,7 +489,15 @@ def _parse_date_nearest_to_span(text: str, match_span, filing_date=None, window_
     return best
 
 
-def _get_sentence_for_span(text: str, match_span, window_chars: int = 250):
+_BOUND_RE = re.compile(r'[.!?\n]')
+
+
+def _sentence_bounds(text: str):
+    """Sorted offsets of every sentence-ending character in text."""
+    return [m.start() for m in _BOUND_RE.finditer(text)]
+
+
+def _get_sentence_for_span(text: str, match_span, window_chars: int = 250, bounds=None):
     if not text or not match_span:
         return None
     try:
@@ -403,18 +506,28 @@ def _get_sentence_for_span(text: str, match_span, window_chars: int = 250):
         return None
 
     center = (s_span + e_span) // 2
-    left = max([text.rfind(p, 0, center) for p in (".", "?", "!", "\n")])
-    if left == -1:
+    # nearest boundary before center and first one at or after it (-1 if none)
+    if bounds is None:
+        # one-off lookup: two regex scans instead of indexing the whole text
+        before = -1
+        for m in _BOUND_RE.finditer(text, 0, center):
+            before = m.start()
+        m = _BOUND_RE.search(text, center)
+        after = m.start() if m else -1
+    else:
+        j = bisect_left(bounds, center)
+        before = bounds[j - 1] if j else -1
+        after = bounds[j] if j < len(bounds) else -1
+
+    if before == -1:
         left = max(0, center - window_chars)
     else:
-        left += 1
+        left = before + 1
 
-    right_candidates = [text.find(p, center) for p in (".", "?", "!", "\n")]
-    right = min([r for r in right_candidates if r != -1], default=-1)
-    if right == -1:
+    if after == -1:
         right = min(len(text), center + window_chars)
     else:
-        right += 1
+        right = after + 1
 
     sent = text[left:right].strip()
     if len(sent) > window_chars * 2:
@@ -1,8 +1,16 @@
 import re
-from typing import List, Dict, Any
+import threading
+from bisect import bisect_left, insort
+from typing import List, Dict, Any, Optional, Set
 
 from .duration_lookup import EventDurationLookup
 
+# optional Hyperscan prefilter; without it every pattern is scanned with `re`
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 
 class EventDetector:
     def __init__(self):
@@ -51,6 +59,56 @@ class EventDetector:
                 'confidence_interval': cfg.get('confidence_interval')
             }
 
+        self._build_prefilter()
+
+    def _build_prefilter(self) -> None:
+        """Compile all patterns into one Hyperscan database used as a prefilter.
+
+        Hyperscan only answers which patterns can match somewhere in the
+        text, in a single pass; the reported matches still come from `re`, so
+        results are unchanged. Prefilter mode may over-report but never
+        misses a match. Patterns Hyperscan cannot compile get no `hs_id` and
+        are always scanned.
+        """
+        self._hs_db = None
+        self._hs_local = threading.local()
+        if hyperscan is None:
+            return
+        flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+                 | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY | hyperscan.HS_FLAG_PREFILTER)
+        expressions, ids = [], []
+        for meta in self.patterns.values():
+            for pat in meta['patterns']:
+                expr = pat['re'].pattern.encode('utf-8')
+                try:
+                    hyperscan.Database().compile(expressions=[expr], ids=[0], elements=1, flags=[flags])
+                except hyperscan.error:
+                    continue
+                pat['hs_id'] = len(ids)
+                expressions.append(expr)
+                ids.append(len(ids))
+        if not expressions:
+            return
+        db = hyperscan.Database()
+        db.compile(expressions=expressions, ids=ids, elements=len(ids), flags=[flags] * len(ids))
+        self._hs_db = db
+
+    def _prefilter(self, text: str) -> Optional[Set[int]]:
+        """Return the `hs_id`s that may match text, or None to scan every pattern."""
+        if self._hs_db is None:
+            return None
+        try:
+            data = text.encode('utf-8')
+        except UnicodeEncodeError:
+            return None
+        # scratch space is per scan, so keep one per thread
+        scratch = getattr(self._hs_local, 'scratch', None)
+        if scratch is None:
+            scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+        hits: Set[int] = set()
+        self._hs_db.scan(data, match_event_handler=lambda hs_id, *_: hits.add(hs_id), scratch=scratch)
+        return hits
+
     def detect_events(self, text: str) -> List[Dict[str, Any]]:
         """Detect all events in the given text and return metadata for each.
 
@@ -60,8 +118,12 @@ class EventDetector:
         joins.
         """
         raw_matches: List[Dict[str, Any]] = []
+        candidates = self._prefilter(text)
         for event_type, meta in self.patterns.items():
             for pat in meta.get('patterns', []):
+                hs_id = pat.get('hs_id')
+                if candidates is not None and hs_id is not None and hs_id not in candidates:
+                    continue
                 compiled = pat.get('re')
                 source = pat.get('source', 'keyword')
                 for m in compiled.finditer(text):
@@ -86,17 +148,16 @@ class EventDetector:
         raw_matches.sort(key=lambda r: (-(r['match_span'][1] - r['match_span'][0]), _source_priority(r.get('pattern_source'))))
 
         kept: List[Dict[str, Any]] = []
-        occupied: List[tuple] = []  # list of kept spans
+        # kept spans never overlap, so sorted by (start, end) their ends are
+        # increasing too: only the last span starting before `e` can reach past `s`
+        occupied: List[tuple] = []
         for r in raw_matches:
             s, e = r['match_span']
-            overlap = False
-            for ks, ke in occupied:
-                if not (e <= ks or s >= ke):
-                    overlap = True
-                    break
-            if not overlap:
-                kept.append(r)
-                occupied.append((s, e))
+            idx = bisect_left(occupied, (e, -1))
+            if idx and occupied[idx - 1][1] > s:
+                continue
+            kept.append(r)
+            insort(occupied, (s, e))
 
         # return kept matches sorted by their appearance in text
         detected = sorted(kept, key=lambda x: x['match_span'][0])
@@ -1,82 +1,237 @@
 import re
 import os
+import heapq
+from bisect import bisect_right
+from collections import defaultdict
+from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+# optional C-level multi-pattern matcher; falls back to per-phrase substring scans
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Determine the keys directory relative to this file
 KEYS_DIR = Path(__file__).parent.parent / "keys"
 
-def _load_keyword_set(filename: str) -> Set[str]:
-    """Safely load a keyword file from the keys/ directory."""
+def _load_keyword_set(filename: str) -> FrozenSet[str]:
+    """Safely load a keyword file from the keys/ directory.
+
+    Contents are cached per file modification time, so edits are picked up
+    without re-reading unchanged files on every call.
+    """
     filepath = KEYS_DIR / filename
     if not filepath.exists():
         raise FileNotFoundError(f"Keyword file not found: {filepath}")
+    return _read_keyword_file(filepath, filepath.stat().st_mtime_ns)
+
+@lru_cache(maxsize=32)
+def _read_keyword_file(filepath: Path, mtime_ns: int) -> FrozenSet[str]:
     with open(filepath, "r", encoding="utf-8") as f:
-        return {line.strip().lower() for line in f if line.strip()}
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+@lru_cache(maxsize=8)
+def _phrase_automaton(critical: FrozenSet[str], high: FrozenSet[str]):
+    """Build one Aho-Corasick automaton over both phrase sets, tagging each phrase by class."""
+    automaton = ahocorasick.Automaton()
+    for ph in critical | high:
+        automaton.add_word(ph, (ph, ph in critical, ph in high))
+    automaton.make_automaton()
+    return automaton
+
+def _count_phrases(sentence_lower: str, critical: FrozenSet[str], high: FrozenSet[str]) -> Tuple[int, int]:
+    """Return how many distinct critical and high-priority phrases occur in the sentence."""
+    if ahocorasick is None:
+        return (sum(1 for ph in critical if ph in sentence_lower),
+                sum(1 for ph in high if ph in sentence_lower))
+    found = {hit for _, hit in _phrase_automaton(critical, high).iter(sentence_lower)}
+    return sum(1 for _, c, _ in found if c), sum(1 for _, _, h in found if h)
+
+def _phrase_hits_by_sentence(sentences_lower: List[str], critical: FrozenSet[str],
+                             high: FrozenSet[str]) -> Dict[int, Tuple[int, int]]:
+    """Map sentence index -> (critical, high) distinct phrase counts, for sentences with any hit.
+
+    With the automaton available, all sentences are scanned in one pass over
+    the newline-joined text and each hit is bucketed by its end offset.
+    """
+    if ahocorasick is None:
+        counts = {}
+        for i, sent_lower in enumerate(sentences_lower):
+            n_critical, n_high = _count_phrases(sent_lower, critical, high)
+            if n_critical or n_high:
+                counts[i] = (n_critical, n_high)
+        return counts
+
+    joined = "\n".join(sentences_lower)
+    # sentence i spans [ends[i-1] + 1, ends[i]); phrases never contain "\n"
+    ends = list(accumulate(len(s) + 1 for s in sentences_lower))
+    found = defaultdict(set)
+    for end, hit in _phrase_automaton(critical, high).iter(joined):
+        found[bisect_right(ends, end)].add(hit)
+    return {
+        i: (sum(1 for _, c, _ in hits if c), sum(1 for _, _, h in hits if h))
+        for i, hits in found.items()
+    }
 
-def _has_risk_context(sentence_lower: str, risk_words: Set[str]) -> bool:
-    words = set(re.findall(r'\b\w+\b', sentence_lower))
-    return bool(words & risk_words)
+def _trie_pattern(words: List[str]) -> str:
+    """Alternation over words with shared prefixes factored out, so `re` branches per character."""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[''] = {}
 
-def _is_boilerplate(sentence: str, exclude_phrases: Set[str]) -> bool:
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ''
+        body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+@lru_cache(maxsize=8)
+def _risk_context_re(risk_words: FrozenSet[str]):
+    # a sentence token can only equal a single \w+ word; other entries never matched
+    words = [w for w in risk_words if re.fullmatch(r'\w+', w)]
+    if not words:
+        return None
+    return re.compile(r'\b' + _trie_pattern(words) + r'\b')
+
+def _has_risk_context(sentence_lower: str, risk_words: FrozenSet[str]) -> bool:
+    pattern = _risk_context_re(risk_words)
+    return pattern is not None and pattern.search(sentence_lower) is not None
+
+@lru_cache(maxsize=8)
+def _exclude_automaton(phrases: FrozenSet[str]):
+    automaton = ahocorasick.Automaton()
+    for ph in phrases:
+        automaton.add_word(ph, ph)
+    automaton.make_automaton()
+    return automaton
+
+_LONG_NUM_RE = re.compile(r'\d{5,}')
+_DELETE_DIGITS = str.maketrans('', '', '0123456789')
+
+def _count_digits(s: str) -> int:
+    if s.isascii():
+        # translate runs in C; non-ASCII text keeps isdigit() for its other digit forms
+        return len(s) - len(s.translate(_DELETE_DIGITS))
+    return sum(c.isdigit() for c in s)
+
+def _is_boilerplate(sentence: str, exclude_phrases: FrozenSet[str]) -> bool:
     lower = sentence.lower()
-    if any(phrase in lower for phrase in exclude_phrases):
-        return True
-    if len(re.findall(r'\d{5,}', sentence)) >= 2:
+    if ahocorasick is not None and exclude_phrases:
+        if next(_exclude_automaton(exclude_phrases).iter(lower), None) is not None:
+            return True
+    elif any(phrase in lower for phrase in exclude_phrases):
         return True
+    n_digits = _count_digits(sentence)
+    # two 5+ digit runs need at least ten digits
+    if n_digits >= 10:
+        m = _LONG_NUM_RE.search(sentence)
+        if m and _LONG_NUM_RE.search(sentence, m.end()):
+            return True
     if len(sentence) > 20:
-        digit_ratio = sum(c.isdigit() for c in sentence) / len(sentence)
+        digit_ratio = n_digits / len(sentence)
         if digit_ratio > 0.15:
             return True
     return False
 
+# _clean_sec_text patterns, compiled once. Passes whose results feed each
+# other stay separate; independent ones share a single alternation.
+_TAG_RE = re.compile(r'<[^>]*>', re.MULTILINE)
+_MARGIN_RE = re.compile(r'margin:\s*\d+pt\s*\d+["\']?\)')
+# all HTML entities in one pass; "&amp;" followed by lt/gt/#NN is decoded
+# twice, as the former one-pass-per-entity sequence did
+_ENTITY_RE = re.compile(r'&amp;(?:lt|gt|#\d+);|&nbsp;|&quot;|&amp;|&lt;|&gt;|&#\d+;')
+_ENTITY_MAP = {
+    '&nbsp;': ' ', '&quot;': '"', '&amp;': '&', '&lt;': '<', '&gt;': '>',
+    '&amp;lt;': '<', '&amp;gt;': '>',
+}
+_BULLET_RE = re.compile(r'\b([a-z])\)\s*')
+_INLINE_BULLET_RE = re.compile(r'([a-z])\)\s*([a-z])')
+# zero-width: digit|Upper and lower|digit boundaries both get a space
+_NUM_LETTER_RE = re.compile(r'(?<=\d)(?=[A-Z])|(?<=[a-z])(?=\d)')
+_EXHIBIT_RE = re.compile(r'\n\s*EXHIBIT\s+\S+.*?(?=\n\s*(?:EXHIBIT|SIGNATURE|ANNEX|\Z))', re.I | re.S)
+_SIGNATURE_RE = re.compile(r'\n\s*SIGNATURE\s+.*', re.I | re.S)
+_EXHIBIT_INDEX_RE = re.compile(r'\n\s*INDEX TO EXHIBITS.*', re.I | re.S)
+_LEGAL_PREAMBLE_RE = re.compile(r'(?i)(?:pursuant to the requirements|in accordance with the)')
+
+def _replace_entity(m: re.Match) -> str:
+    # numeric entities are dropped
+    return _ENTITY_MAP.get(m.group(0), '')
+
 def _clean_sec_text(raw: str) -> str:
-    # Remove all HTML/XML tags (including incomplete ones and with attributes)
-    raw = re.sub(r'<[^>]*>', '', raw, flags=re.MULTILINE)
-    # Remove leftover tag fragments
-    raw = re.sub(r'["\']?\s*>\s*</\w+>', '', raw)
-    raw = re.sub(r'["\'>]+\s*</p>', '', raw)
-    raw = re.sub(r'margin:\s*\d+pt\s*\d+["\']?\)', '', raw)
+    # Remove all HTML/XML tags (including incomplete ones and with attributes).
+    # Afterwards no '<' precedes a '>', so closing-tag fragments cannot remain.
+    raw = _TAG_RE.sub('', raw)
+    raw = _MARGIN_RE.sub('', raw)
     # Remove HTML entities
-    raw = re.sub(r'&nbsp;', ' ', raw)
-    raw = re.sub(r'&quot;', '"', raw)
-    raw = re.sub(r'&amp;', '&', raw)
-    raw = re.sub(r'&lt;', '<', raw)
-    raw = re.sub(r'&gt;', '>', raw)
-    raw = re.sub(r'&#\d+;', '', raw)
+    raw = _ENTITY_RE.sub(_replace_entity, raw)
     # Remove bullet points and list markers
-    raw = re.sub(r'\b([a-z])\)\s*', r'', raw)
-    raw = re.sub(r'([a-z])\)\s*([a-z])', r'\1\2', raw)
+    raw = _BULLET_RE.sub('', raw)
+    raw = _INLINE_BULLET_RE.sub(r'\1\2', raw)
     # Add spaces between numbers and letters
-    raw = re.sub(r'(\d)([A-Z])', r'\1 \2', raw)
-    raw = re.sub(r'([a-z])(\d)', r'\1 \2', raw)
+    raw = _NUM_LETTER_RE.sub(' ', raw)
     # Remove sections
-    raw = re.sub(r'\n\s*EXHIBIT\s+\S+.*?(?=\n\s*(?:EXHIBIT|SIGNATURE|ANNEX|\Z))', '', raw, flags=re.I | re.S)
-    raw = re.sub(r'\n\s*SIGNATURE\s+.*', '', raw, flags=re.I | re.S)
-    raw = re.sub(r'\n\s*INDEX TO EXHIBITS.*', '', raw, flags=re.I | re.S)
-    raw = re.sub(r'(?i)(?:pursuant to the requirements|in accordance with the)', '', raw)
+    raw = _EXHIBIT_RE.sub('', raw)
+    raw = _SIGNATURE_RE.sub('', raw)
+    raw = _EXHIBIT_INDEX_RE.sub('', raw)
+    raw = _LEGAL_PREAMBLE_RE.sub('', raw)
     # Final cleanup of extra whitespace
-    raw = re.sub(r'\s+', ' ', raw).strip()
-    return raw
+    return ' '.join(raw.split())
+
+_MASK_RE = re.compile(r'(provided\s*,?\s+however)|notwithstanding', re.I)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+_CLAUSE_SPLIT_RE = re.compile(r'[.;]\s+')
+
+def _mask_phrase(m: re.Match) -> str:
+    return '~~PH~~' if m.group(1) else '~~NW~~'
+
+def _unmask(s: str) -> str:
+    if '~~' not in s:
+        return s
+    return s.replace('~~PH~~', 'provided, however').replace('~~NW~~', 'notwithstanding')
 
 def _split_into_sentences(text: str) -> List[str]:
+    """Split whitespace-normalized text (as from _clean_sec_text) into sentences of 6+ words.
+
+    Words are counted as single spaces + 1 rather than building a list per sentence.
+    """
     # Preserve your excellent regex-based splitter (no NLTK dependency)
-    text = re.sub(r'provided\s*,?\s+however', '~~PH~~', text, flags=re.I)
-    text = re.sub(r'notwithstanding', '~~NW~~', text, flags=re.I)
+    text = _MASK_RE.sub(_mask_phrase, text)
 
-    sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
     refined = []
-    for s in sentences:
+    for s in _SENTENCE_SPLIT_RE.split(text):
         s = s.strip()
-        if not s or len(s.split()) < 6:
+        if not s:
+            continue
+        n_words = s.count(' ') + 1
+        if n_words < 6:
             continue
-        if len(s.split()) > 60:
-            parts = re.split(r'[.;]\s+', s)
-            refined.extend([p.strip() for p in parts if p.strip() and len(p.split()) >= 6])
+        if n_words > 60:
+            for p in _CLAUSE_SPLIT_RE.split(s):
+                p = p.strip()
+                if p and p.count(' ') >= 5:
+                    refined.append(_unmask(p))
         else:
-            refined.append(s)
+            refined.append(_unmask(s))
 
-    return [s.replace('~~PH~~', 'provided, however').replace('~~NW~~', 'notwithstanding') for s in refined]
+    return refined
+
+# deletes every ASCII character except a-z
+_FP_TBL = {i: None for i in range(128) if not 97 <= i <= 122}
+_NON_AZ_RE = re.compile(r'[^a-z]')
+
+def _fingerprint(sentence_lower: str) -> str:
+    if sentence_lower.isascii():
+        return sentence_lower.translate(_FP_TBL)
+    return _NON_AZ_RE.sub('', sentence_lower)
 
 def _smart_truncate(text: str, max_len: int = 280) -> str:
     if len(text) <= max_len:
@@ -91,7 +246,7 @@ def find_dangerous_sentences(sec_document: str) -> List[str]:
     Analyze a cleaned SEC document and return high-risk sentences.
     Keyword files are loaded on-demand from backend/keys/.
     """
-    # Load keyword sets (lazily, per call)
+    # Load keyword sets (cached after the first call)
     try:
         CRITICAL_PHRASES = _load_keyword_set("critical_phrases.txt")
         HIGH_PRIORITY_PHRASES = _load_keyword_set("high_priority_phrases.txt")
@@ -100,47 +255,39 @@ def find_dangerous_sentences(sec_document: str) -> List[str]:
     except FileNotFoundError as e:
         raise RuntimeError(f"Missing keyword file: {e}")
 
-    ALL_PHRASES = CRITICAL_PHRASES | HIGH_PRIORITY_PHRASES
-
-    # Escape phrases for regex
-    escaped = [re.escape(p) for p in ALL_PHRASES]
-    pattern = re.compile(r'\b(?:' + '|'.join(escaped) + r')\b', re.IGNORECASE)
-
     clean_text = _clean_sec_text(sec_document)
     sentences = _split_into_sentences(clean_text)
+    sentences_lower = [s.lower() for s in sentences]
+    # only sentences containing a risk phrase go through the per-sentence checks
+    phrase_hits = _phrase_hits_by_sentence(sentences_lower, CRITICAL_PHRASES, HIGH_PRIORITY_PHRASES)
 
     seen_fingerprints: Set[str] = set()
     scored: List[tuple[int, str]] = []
 
-    for sent in sentences:
-        if len(sent.split()) < 6:
-            continue
+    for i in sorted(phrase_hits):
+        sent = sentences[i]
+        sent_lower = sentences_lower[i]
+        n_critical, n_high = phrase_hits[i]
         if _is_boilerplate(sent, BOILERPLATE_EXCLUDE):
             continue
-
-        sent_lower = sent.lower()
-        found_critical = [ph for ph in CRITICAL_PHRASES if ph in sent_lower]
-        found_high = [ph for ph in HIGH_PRIORITY_PHRASES if ph in sent_lower]
-
-        if not (found_critical or found_high):
-            continue
         if not _has_risk_context(sent_lower, RISK_CONTEXT_WORDS):
             continue
 
         # Deduplication via fingerprint
-        fingerprint = re.sub(r'[^a-z]', '', sent_lower)
+        if len(sent_lower) < 35:
+            continue
+        fingerprint = _fingerprint(sent_lower)
         if len(fingerprint) < 35 or fingerprint in seen_fingerprints:
             continue
         seen_fingerprints.add(fingerprint)
 
         # Scoring (keep single high-priority if impactful)
-        score = len(found_critical) * 15 + len(found_high) * 10
+        score = n_critical * 15 + n_high * 10
         if score < 10:  # Reduced threshold to catch strong single phrases
             continue
 
         display = _smart_truncate(sent)
         scored.append((score, display))
 
-    # Return top 10 by score
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [s for _, s in scored[:10]]
\ No newline at end of file
+    # Return top 10 by score (ties keep document order, as a stable sort would)
+    return [s for _, s in heapq.nlargest(10, scored, key=lambda x: x[0])]
\ No newline at end of file
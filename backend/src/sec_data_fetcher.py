@@ -1,59 +1,280 @@
 import os
 import json
 import time
+import hashlib
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# optional C JSON parser for the ticker list and submissions
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # === CONFIGURATION ===
 USER_AGENT = "gh.wabil@gmail.com"  # Must be a real email
 TICKERS_FILE = "company_tickers.json"
-REQUEST_DELAY = 1.2  # seconds between requests (SEC allows ≤10/sec, but be conservative)
+REQUEST_DELAY = 0.125  # seconds between request starts across all threads (SEC allows ≤10/sec)
+DOWNLOAD_WORKERS = 8  # filings downloaded concurrently
+DOWNLOAD_CHUNK_SIZE = 65536  # bytes per streamed write
+CACHE_DIR = os.path.join(".cache", "sec")  # raw SEC responses, one file per URL
+SUBMISSIONS_TTL = 24 * 3600  # seconds; submissions lists change as new filings land
+TICKERS_TTL = 7 * 24 * 3600  # seconds between company_tickers.json refreshes
+TICKERS_RETRY_DELAY = 600  # seconds before retrying a failed refresh of a stale ticker list
+CACHE_MAX_BYTES = 2 * 1024 ** 3  # least recently used entries are evicted above this
+CACHE_MAX_AGE = 30 * 24 * 3600  # seconds; entries unused for this long are evicted
+
+def _make_session() -> requests.Session:
+    """
+    Build a keep-alive session that retries SEC's rate-limit (429) and transient 5xx
+    responses, sleeping for the server's Retry-After when sent and jittered backoff otherwise.
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    retry = Retry(
+        total=5,
+        backoff_factor=1,
+        backoff_jitter=0.5,  # spread out retries from concurrent downloads
+        status_forcelist=[429, 502, 503, 504],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=max(10, DOWNLOAD_WORKERS),
+        max_retries=retry,
+    )
+    session.mount("https://", adapter)
+    return session
+
+# shared by all download threads so connections to www.sec.gov / data.sec.gov are reused
+_SESSION = _make_session()
+
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+def _throttle():
+    """Block until this thread may start an SEC request, spacing all requests REQUEST_DELAY apart."""
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_request_at - now
+        _next_request_at = max(now, _next_request_at) + REQUEST_DELAY
+    if wait > 0:
+        time.sleep(wait)
+
+def _is_fresh(path: str, ttl=None) -> bool:
+    """True if path exists and is younger than ttl seconds (ttl=None never expires)."""
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        return False
+    return ttl is None or age < ttl
+
+def _fetch_cached(url: str, headers: dict, ttl=None) -> str:
+    """
+    Return the path of an on-disk copy of url under CACHE_DIR (keyed by md5 of the URL),
+    downloading it first if it is missing or older than ttl. The file's mtime is its timestamp.
+    """
+    cache_path = os.path.join(CACHE_DIR, hashlib.md5(url.encode("utf-8")).hexdigest())
+    if _is_fresh(cache_path, ttl):
+        if ttl is None:
+            # never-expiring entries use mtime as last-use time for _prune_cache
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
+        return cache_path
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # write under a per-thread temp name and rename, so a failed or concurrent
+    # download never leaves a truncated entry that later looks like a hit
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        _throttle()
+        with _SESSION.get(url, headers=headers, stream=True) as r:
+            r.raise_for_status()
+            with open(tmp_path, "wb") as f:
+                for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return cache_path
+
+def _prune_cache():
+    """Evict cache entries unused for CACHE_MAX_AGE, then the oldest until under CACHE_MAX_BYTES."""
+    now = time.time()
+    entries = []
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            for e in it:
+                # .part files belong to downloads still in progress
+                if e.name.endswith(".part") or not e.is_file():
+                    continue
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+        return
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in entries:
+        if now - mtime < CACHE_MAX_AGE and total <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def _link_or_copy(src: str, dst: str):
+    """Hard-link src to dst so a filing isn't stored twice; copy where links aren't possible."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        # e.g. dest_dir on another filesystem
+        shutil.copyfile(src, dst)
+
+_tickers_retry_at = 0.0
 
 # === HELPER: Load or download company tickers ===
 def _load_company_data():
+    """
+    Return (ticker -> CIK map, mtime of the TICKERS_FILE it was read from),
+    downloading the file first if it is missing or older than TICKERS_TTL.
+    """
+    global _tickers_retry_at
     headers = {"User-Agent": USER_AGENT}
-    if not os.path.exists(TICKERS_FILE):
+    exists = os.path.exists(TICKERS_FILE)
+    # after a failed refresh, keep serving the stale copy for a while
+    # instead of hitting SEC again on every call
+    if not _is_fresh(TICKERS_FILE, TICKERS_TTL) and (not exists or time.monotonic() >= _tickers_retry_at):
         print("🌍 Downloading company_tickers.json from SEC.gov...")
-        resp = requests.get("https://www.sec.gov/files/company_tickers.json", headers=headers)
-        resp.raise_for_status()
-        with open(TICKERS_FILE, "w") as f:
-            json.dump(resp.json(), f)
-        time.sleep(REQUEST_DELAY)
+        # written aside and renamed, so a failed refresh never truncates the old copy
+        tmp_path = f"{TICKERS_FILE}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            _throttle()
+            resp = _SESSION.get("https://www.sec.gov/files/company_tickers.json", headers=headers)
+            resp.raise_for_status()
+            with open(tmp_path, "w") as f:
+                json.dump(resp.json(), f)
+            os.replace(tmp_path, TICKERS_FILE)
+        except Exception as e:
+            # a stale ticker list is still usable; only fail if there is none at all
+            if not exists:
+                raise
+            _tickers_retry_at = time.monotonic() + TICKERS_RETRY_DELAY
+            print(f"⚠️ Could not refresh {TICKERS_FILE}, using cached copy: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    with open(TICKERS_FILE, "rb") as f:
+        mtime = os.fstat(f.fileno()).st_mtime
+        raw_data = _json_loads(f.read())
+    # ticker -> CIK is all callers need, so no DataFrame is built. Rows are walked
+    # in reverse so the first row for a ticker wins; CIKs stay raw ints and are
+    # zero-padded only for the ticker looked up (see _cik_for).
+    return {row["ticker"].upper(): row["cik_str"] for row in reversed(raw_data.values())}, mtime
+
+_company_lock = threading.Lock()
+_company_cache = None  # (ticker -> CIK map, TICKERS_FILE mtime it was parsed from)
+
+def _company_data():
+    """
+    Return the ticker -> CIK map, loading it on first use so importing this module stays cheap.
+    It is reloaded once TICKERS_FILE passes TICKERS_TTL (which refreshes it) or changes on disk.
+    """
+    global _company_cache
+    with _company_lock:
+        cache = _company_cache
+        try:
+            mtime = os.path.getmtime(TICKERS_FILE)
+        except OSError:
+            mtime = None
+        # a stale file is only worth reloading when a refresh may be attempted
+        stale = not _is_fresh(TICKERS_FILE, TICKERS_TTL) and time.monotonic() >= _tickers_retry_at
+        if cache is None or mtime != cache[1] or stale:
+            _company_cache = cache = _load_company_data()
+        return cache[0]
+
+def _cik_for(ticker_upper: str):
+    """Return the 10-digit zero-padded CIK for a ticker, or None if SEC doesn't list it."""
+    cik = _company_data().get(ticker_upper)
+    return None if cik is None else str(cik).zfill(10)
 
-    with open(TICKERS_FILE, "r") as f:
-        raw_data = json.load(f)
-    df = pd.DataFrame.from_dict(raw_data, orient="index")
-    df["cik_str"] = df["cik_str"].astype(str).str.zfill(10)
-    return df
+def _download_filing(i: int, acc_raw: str, form: str, filing_date: str, *, base_url: str, ticker_dir: str,
+                     headers: dict, num_filings: int) -> bool:
+    """Write metadata.json and download one filing into <ticker_dir>/<i + 1>/; return success."""
+    acc_clean = acc_raw.replace("-", "")
 
-# Load once at module level (safe for API use if file I/O is local)
-companyData = _load_company_data()
+    # Skip non-10-K/Q if desired (optional)
+    # if form not in ["10-K", "10-Q"]:
+    #     return False
+
+    filing_dir = os.path.join(ticker_dir, str(i + 1))
+    os.makedirs(filing_dir, exist_ok=True)
+    filename = f"{acc_raw}.txt"
+    file_path = os.path.join(filing_dir, filename)
+
+    # Save metadata (filing date and form type)
+    metadata = {
+        "filing_date": filing_date,
+        "form_type": form,
+        "accession_number": acc_raw
+    }
+    with open(os.path.join(filing_dir, "metadata.json"), "w") as mf:
+        json.dump(metadata, mf)
+
+    # Construct correct URL
+    file_url = f"{base_url}/{acc_clean}/{acc_raw}.txt"
+
+    print(f"📄 Downloading {form} filing ({i+1}/{num_filings}): {file_url}")
+
+    # 429/5xx retries (honoring Retry-After) happen in the session's adapter
+    try:
+        # accession numbers are immutable, so a cached filing never goes stale
+        # (it only leaves the cache through _prune_cache)
+        _link_or_copy(_fetch_cached(file_url, headers), file_path)
+        return True
+    except Exception as e:
+        print(f"   ❌ Download failed: {e}")
+        # don't leave a truncated filing behind for analysis
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return False
 
 # === MAIN FUNCTION ===
-def download_sec_filings(ticker_symbol: str, num_filings: int = 5, user_agent: str = USER_AGENT):
+def download_sec_filings(ticker_symbol: str, num_filings: int = 5, user_agent: str = USER_AGENT,
+                         dest_dir: str = "."):
     """
     Downloads the N latest SEC filings (as plain-text .txt files) for a given ticker.
     Only the primary submission file is downloaded per filing to comply with SEC policy.
 
-    Saves to: ./<TICKER>/1/<accession>.txt, ./<TICKER>/2/..., etc.
+    Saves to: <dest_dir>/<TICKER>/1/<accession>.txt, <dest_dir>/<TICKER>/2/..., etc.
 
     Args:
         ticker_symbol (str): e.g., "AAPL"
         num_filings (int): Number of recent filings to download (default: 5)
         user_agent (str): Your contact email (required by SEC)
+        dest_dir (str): Directory to create the ticker folder in (default: cwd)
 
     Returns:
         str or None: Path to the main ticker directory if successful, else None
     """
     ticker_upper = ticker_symbol.upper()
-    cik_row = companyData[companyData["ticker"] == ticker_upper]
-    if cik_row.empty:
+    cik = _cik_for(ticker_upper)
+    if cik is None:
         print(f"❌ Ticker '{ticker_symbol}' not found in SEC company database.")
         return None
 
-    cik = cik_row["cik_str"].iloc[0]
-    ticker_dir = ticker_upper
+    ticker_dir = os.path.join(dest_dir, ticker_upper)
 
     # Clean existing folder
     if os.path.exists(ticker_dir):
@@ -65,12 +286,10 @@ def download_sec_filings(ticker_symbol: str, num_filings: int = 5, user_agent: s
     submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
 
     print(f"📥 Fetching submissions list from: {submissions_url}")
-    time.sleep(REQUEST_DELAY)
 
     try:
-        resp = requests.get(submissions_url, headers=headers)
-        resp.raise_for_status()
-        submissions = resp.json()
+        with open(_fetch_cached(submissions_url, headers, SUBMISSIONS_TTL), "rb") as f:
+            submissions = _json_loads(f.read())
         recent = submissions["filings"]["recent"]
     except Exception as e:
         print(f"⚠️ Failed to fetch filings list for CIK {cik}: {e}")
@@ -79,59 +298,23 @@ def download_sec_filings(ticker_symbol: str, num_filings: int = 5, user_agent: s
     accession_numbers = recent.get("accessionNumber", [])
     form_types = recent.get("form", [])
     filing_dates = recent.get("filingDate", [])
-    downloaded = 0
-
-    for i in range(min(num_filings, len(accession_numbers))):
-        acc_raw = accession_numbers[i]
-        form = form_types[i]
-        filing_date = filing_dates[i] if i < len(filing_dates) else "N/A"
-        acc_clean = acc_raw.replace("-", "")
-
-        # Skip non-10-K/Q if desired (optional)
-        # if form not in ["10-K", "10-Q"]:
-        #     continue
-
-        filing_dir = os.path.join(ticker_dir, str(i + 1))
-        os.makedirs(filing_dir, exist_ok=True)
-        filename = f"{acc_raw}.txt"
-        file_path = os.path.join(filing_dir, filename)
-
-        # Save metadata (filing date and form type)
-        metadata = {
-            "filing_date": filing_date,
-            "form_type": form,
-            "accession_number": acc_raw
-        }
-        with open(os.path.join(filing_dir, "metadata.json"), "w") as mf:
-            json.dump(metadata, mf)
-
-        # Construct correct URL
-        file_url = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{acc_clean}/{acc_raw}.txt"
-
-        print(f"📄 Downloading {form} filing ({i+1}/{num_filings}): {file_url}")
-
-        success = False
-        for attempt in range(3):
-            try:
-                time.sleep(REQUEST_DELAY)
-                r = requests.get(file_url, headers=headers)
-                if r.status_code == 503:
-                    wait = 2 ** attempt  # exponential backoff: 1s, 2s, 4s
-                    print(f"   ⚠️ 503 error. Retrying in {wait}s...")
-                    time.sleep(wait)
-                    continue
-                r.raise_for_status()
-                with open(file_path, "wb") as f:
-                    f.write(r.content)
-                success = True
-                downloaded += 1
-                break
-            except Exception as e:
-                print(f"   ❌ Attempt {attempt + 1} failed: {e}")
-                time.sleep(2 ** attempt)
-
-        if not success:
-            print(f"   ❌ Failed to download after 3 attempts.")
-
-    print(f"\n✅ Successfully downloaded {downloaded} filings to ./{ticker_dir}/")
+    n = min(num_filings, len(accession_numbers))
+    jobs = [
+        (i, accession_numbers[i], form_types[i], filing_dates[i] if i < len(filing_dates) else "N/A")
+        for i in range(n)
+    ]
+    # per-company part of every filing's Archives URL, built once
+    base_url = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}"
+    # downloads are network-bound; threads overlap them while _throttle keeps
+    # the combined request rate under SEC's limit
+    with ThreadPoolExecutor(max_workers=max(1, min(n, DOWNLOAD_WORKERS))) as ex:
+        results = list(ex.map(
+            lambda job: _download_filing(*job, base_url=base_url, ticker_dir=ticker_dir, headers=headers,
+                                         num_filings=num_filings),
+            jobs,
+        ))
+    downloaded = sum(results)
+    _prune_cache()
+
+    print(f"\n✅ Successfully downloaded {downloaded} filings to {ticker_dir}/")
     return os.path.abspath(ticker_dir)
\ No newline at end of file
@@ -1,23 +1,59 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
 import pandas as pd
-from typing import List, Dict
+from typing import IO, List, Dict, Union
 
-def get_symbols_from_csv(csv_path: str) -> List[str]:
-    df = pd.read_csv(csv_path)
+YF_WORKERS = 16  # concurrent Yahoo requests
+YF_CACHE_DIR = os.path.join(".cache", "yfinance")
+YF_CACHE_TTL = 24 * 3600  # seconds; fundamentals change slowly
+
+_SYMBOL_COLUMNS = ('symbol', 'ticker', 'stock', 'stock_symbol', 'stock_ticker')
+
+def get_symbols_from_csv(csv_source: Union[str, IO]) -> List[str]:
+    # accepts a path or an open file object; the header is read first so
+    # only the symbol column is parsed
+    start = None if isinstance(csv_source, str) else csv_source.tell()
+    columns = pd.read_csv(csv_source, nrows=0).columns
+    if start is not None:
+        csv_source.seek(start)
     # Try to find a column with symbol/ticker
-    for col in df.columns:
-        if col.lower() in ('symbol', 'ticker', 'stock', 'stock_symbol', 'stock_ticker'):
-            return df[col].dropna().astype(str).unique().tolist()
+    target = next((col for col in columns if col.lower() in _SYMBOL_COLUMNS), None)
     # Fallback: use first column
-    return df.iloc[:, 0].dropna().astype(str).unique().tolist()
+    usecols = [target] if target is not None else [0]
+    col = pd.read_csv(csv_source, usecols=usecols, dtype=str).iloc[:, 0]
+    return col.dropna().drop_duplicates().tolist()
+
+def _fetch_info(symbol: str) -> dict:
+    # cached per symbol on disk; errors are returned but never cached
+    cache_path = os.path.join(YF_CACHE_DIR, hashlib.md5(symbol.encode('utf-8')).hexdigest() + '.json')
+    try:
+        if time.time() - os.path.getmtime(cache_path) < YF_CACHE_TTL:
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        info = yf.Ticker(symbol).info
+    except Exception as e:
+        return {'error': str(e)}
+
+    try:
+        os.makedirs(YF_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(tmp_path, 'w') as f:
+            json.dump(info, f, default=str)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
+    return info
 
 def fetch_yfinance_data(symbols: List[str]) -> Dict[str, dict]:
-    data = {}
-    for symbol in symbols:
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            data[symbol] = info
-        except Exception as e:
-            data[symbol] = {'error': str(e)}
-    return data
+    # each .info is a blocking HTTP call; threads overlap the waits
+    with ThreadPoolExecutor(max_workers=max(1, min(len(symbols), YF_WORKERS))) as ex:
+        return dict(zip(symbols, ex.map(_fetch_info, symbols)))
@@ -1,20 +1,71 @@
 import re
 import os
+import mmap
 from pathlib import Path
-from bs4 import BeautifulSoup
+from lxml import html
+
+# optional DFA-based regex engine; falls back to `re`
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# optional lexbor-based HTML parser (faster than lxml); falls back to lxml
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+_HIDDEN_TAGS = ('script', 'style', 'header', 'footer', 'nav', 'form', 'img')
+_HIDDEN_SELECTOR = ','.join(_HIDDEN_TAGS)
+_TAG_START_RE = re.compile(r'<[A-Za-z/!?]')
+
+# extract_clean_text patterns, compiled once. Page markers, dates, URLs,
+# emails and long numbers (e.g. internal IDs) are all removed in a single
+# leftmost-first pass: scanning left to right, the earliest match wins (ties
+# go to the alternative listed first) and is removed whole. A token matching
+# several kinds is therefore removed as one unit, e.g. "x@www.foo.com" goes
+# entirely as an email, where separate per-pattern passes would have removed
+# the URL part first and left "x@".
+_WS_RE = re.compile(r'\s+')
+_NOISE_PATTERN = (
+    r'(?i:Page \d+ of \d+)'
+    r'|\b\d{1,2}/\d{1,2}/\d{2,4}\b'
+    r'|https?://\S+|www\.\S+'
+    r'|\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    r'|\b\d{6,}\b'
+)
+# RE2 runs the noise pass in linear time with no backtracking. It only
+# differs from `re` in treating \b and \d as ASCII, and whitespace is
+# already normalized by then, so \S behaves the same.
+_NOISE_RE = re2.compile(_NOISE_PATTERN) if re2 is not None else re.compile(_NOISE_PATTERN)
 
 def read_filing_file(file_path: str) -> str:
     """
     Read a filing file (.txt or .html) with robust encoding handling.
+    The file is memory-mapped and decoded straight from the mapping, so no
+    bytes copy of it is made; bytes that are not valid UTF-8 become U+FFFD.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map an empty file
+                return ''
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    return str(mm, 'utf-8')
+                except UnicodeDecodeError:
+                    return str(mm, 'utf-8', 'replace')
+    except OSError as e:
+        raise ValueError(f"Could not read file {file_path}: {e}") from e
+
+def _has_markup(text: str) -> bool:
+    """
+    True if an HTML parser would act on text: a tag/comment/PI start, an entity, a NUL,
+    or a leading BOM (lxml drops it). Text with none of these comes out of the parser unchanged.
     """
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    for enc in encodings:
-        try:
-            with open(file_path, 'r', encoding=enc) as f:
-                return f.read()
-        except (UnicodeDecodeError, OSError):
-            continue
-    raise ValueError(f"Could not read file {file_path} with any standard encoding.")
+    return (text.startswith('\ufeff') or '&' in text or '\x00' in text
+            or ('<' in text and _TAG_START_RE.search(text) is not None))
 
 def extract_clean_text(html_or_text: str) -> str:
     """
@@ -22,25 +73,35 @@ def extract_clean_text(html_or_text: str) -> str:
     Handles both raw HTML and plain text (with embedded HTML tags).
     """
     try:
-        # Use BeautifulSoup to remove scripts/styles and extract visible text
-        soup = BeautifulSoup(html_or_text, 'html.parser')
-        for tag in soup(['script', 'style', 'header', 'footer', 'nav', 'form', 'img']):
-            tag.decompose()
-        # Get all visible text
-        text = ' '.join(soup.stripped_strings)
+        if not _has_markup(html_or_text):
+            # Plain text (e.g. pre-2001 filings): skip parsing entirely
+            text = html_or_text
+        elif LexborHTMLParser is not None:
+            # Parse with lexbor and drop non-visible elements
+            tree = LexborHTMLParser(html_or_text)
+            for node in tree.css(_HIDDEN_SELECTOR):
+                node.decompose()
+            root = tree.root
+            # Get all visible text
+            text = root.text(separator=' ', strip=True) if root is not None else ''
+        else:
+            # Parse with lxml directly and drop non-visible elements
+            parser = html.HTMLParser(encoding='utf-8', huge_tree=True)
+            root = html.fromstring(html_or_text.encode('utf-8'), parser=parser)
+            for el in list(root.iter(*_HIDDEN_TAGS)):
+                # keep the tail: text after the element is still visible
+                el.clear(keep_tail=True)
+            # Get all visible text
+            text = ' '.join(s for s in (t.strip() for t in root.itertext()) if s)
     except Exception as e:
-        # If BeautifulSoup rejects the markup, treat as plain text
+        # If the parser rejects the markup, treat as plain text
         print(f"[extract_clean_text] Warning: Markup rejected by parser, treating as plain text. Error: {e}")
         text = html_or_text
 
     # Now apply **conservative** cleaning (preserve financial/legal terms)
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-    text = re.sub(r'Page \d+ of \d+', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\b\d{1,2}/\d{1,2}/\d{2,4}\b', '', text)  # Remove dates
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)         # Remove URLs
-    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text)  # Emails
-    text = re.sub(r'\b\d{6,}\b', '', text)  # Remove long numbers (e.g., internal IDs)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text)  # Normalize whitespace
+    text = _NOISE_RE.sub('', text)
+    text = _WS_RE.sub(' ', text).strip()
     return text
 
 def process_filing_file(file_path: str) -> str:
@@ -0,0 +1,16 @@
+from datetime import date
+
+from src.api import _find_dates_in_text
+
+
+def test_unparseable_month_name_does_not_hide_iso_date():
+    # "loss 5, 2023" looks like a month-name date but does not parse;
+    # it must not swallow the ISO date it overlaps
+    assert _find_dates_in_text("loss 5, 2023-01-05 filed") == [(date(2023, 1, 5), 8, 18)]
+
+
+def test_results_grouped_iso_then_us_then_month_name():
+    text = "March 3, 2021 and 04/05/2022 and 2020-06-07"
+    assert [d for d, _, _ in _find_dates_in_text(text)] == [
+        date(2020, 6, 7), date(2022, 4, 5), date(2021, 3, 3),
+    ]
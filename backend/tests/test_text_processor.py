@@ -0,0 +1,12 @@
+from src.text_processor import extract_clean_text
+
+
+def test_token_matching_url_and_email_is_removed_whole():
+    # the single noise pass removes the whole token as an email; it does not
+    # strip the URL part first and leave "x@" behind
+    assert extract_clean_text("contact x@www.foo.com today") == "contact today"
+
+
+def test_noise_removed_between_words():
+    text = "Page 3 of 10 filed 12/31/2023 see https://sec.gov/x or a@b.com id 1234567 end"
+    assert extract_clean_text(text) == "filed see or id end"